@@ -0,0 +1,192 @@
+"""Пакетный симулятор THE_SNAKE на NumPy.
+
+Много независимых игр змейки (без ботов) хранятся в массивах
+и продвигаются одним векторизованным тактом. Правила движения
+повторяют Snake.get_new_head_position, правила длины и скорости -
+Snake.length_affect и Snake.speed_affect, столкновения с яблоками -
+Game.is_collision, самоукус - Game.handle_selfbite.
+"""
+
+import numpy as np
+
+from settings import (
+    GRID_SIZE, GRID_WIDTH, GRID_HEIGHT, SCREEN_WIDTH, SCREEN_HEIGHT,
+    CENTER, UP, DOWN, LEFT, RIGHT, SPEED_DELTA, EASY_START_SPEED,
+    MAX_SPEED, TURNS, K_UP, K_DOWN, K_LEFT, K_RIGHT
+)
+
+
+# Действия: 0 - ничего не нажато, 1..4 - стрелки
+ACTION_KEYS = (None, K_UP, K_DOWN, K_LEFT, K_RIGHT)
+DIRECTIONS = np.array([UP, DOWN, LEFT, RIGHT], dtype=np.int32)
+NO_TURN = -1
+# Таблица поворотов [индекс направления, действие] -> индекс направления
+TURN_TABLE = np.array(
+    [
+        [NO_TURN] + [
+            [UP, DOWN, LEFT, RIGHT].index(TURNS[(direction, key)])
+            if (direction, key) in TURNS else NO_TURN
+            for key in ACTION_KEYS[1:]
+        ]
+        for direction in (UP, DOWN, LEFT, RIGHT)
+    ],
+    dtype=np.int8
+)
+# Сила яблок как в Game: обычное яблоко и экстраз от -3 до +3
+SNACK_POWERS = (1, -3, -2, -1, 0, 1, 2, 3)
+SELFBITE_OFFSET = GRID_SIZE * 3
+START_CAPACITY = GRID_SIZE * 8
+
+
+class BatchGame:
+    """num_games независимых игр змейки в массивах NumPy.
+    Тело каждой змеи - кольцевой буфер упакованных позиций y * W + x.
+    """
+
+    def __init__(
+            self, num_games, seed=None, snack_powers=SNACK_POWERS,
+            speed_mode=EASY_START_SPEED
+    ):
+        """Инициализация всех игр в стартовом состоянии"""
+        self.num_games = num_games
+        self.rng = np.random.default_rng(seed)
+        self.rows = np.arange(num_games)
+        self.speed_mode = speed_mode
+        self.snack_powers = np.array(snack_powers, dtype=np.int32)
+        self.heads = np.zeros((num_games, 2), dtype=np.int32)
+        self.directions = np.zeros(num_games, dtype=np.int8)
+        self.lengths = np.zeros(num_games, dtype=np.int32)
+        self.speeds = np.zeros(num_games, dtype=np.int32)
+        self.body = np.zeros((num_games, START_CAPACITY), dtype=np.int32)
+        self.head_slots = np.zeros(num_games, dtype=np.int64)
+        self.body_lengths = np.zeros(num_games, dtype=np.int64)
+        self.snacks = self.random_cells((num_games, len(snack_powers)))
+        self.snacks_active = np.ones(
+            (num_games, len(snack_powers)), dtype=bool
+        )
+        self.best_lengths = np.ones(num_games, dtype=np.int32)
+        self.reset(np.ones(num_games, dtype=bool))
+
+    def random_cells(self, shape):
+        """Случайные клетки поля в пикселях, массив shape + (2,)"""
+        cells = np.empty(shape + (2,), dtype=np.int32)
+        cells[..., 0] = self.rng.integers(0, GRID_WIDTH, shape) * GRID_SIZE
+        cells[..., 1] = self.rng.integers(0, GRID_HEIGHT, shape) * GRID_SIZE
+        return cells
+
+    def reset(self, mask):
+        """Сброс игр из маски в начальное состояние как в Snake.reset"""
+        count = int(mask.sum())
+        self.heads[mask] = CENTER
+        self.directions[mask] = self.rng.integers(0, 4, count)
+        self.lengths[mask] = GRID_SIZE
+        self.speeds[mask] = self.speed_mode
+        self.head_slots[mask] = 0
+        self.body_lengths[mask] = 1
+        self.body[mask, 0] = self.pack(self.heads[mask])
+
+    @staticmethod
+    def pack(positions):
+        """Упаковка позиций (x, y) в одно число y * SCREEN_WIDTH + x"""
+        return positions[..., 1] * SCREEN_WIDTH + positions[..., 0]
+
+    def grow_body(self):
+        """Удвоение емкости кольцевого буфера тела.
+        Голова каждой змеи переезжает в нулевую ячейку.
+        """
+        capacity = self.body.shape[1]
+        order = (self.head_slots[:, None] + np.arange(capacity)) % capacity
+        body = np.zeros((self.num_games, capacity * 2), dtype=np.int32)
+        body[:, :capacity] = np.take_along_axis(self.body, order, axis=1)
+        self.body = body
+        self.head_slots[:] = 0
+
+    def move(self, actions):
+        """Поворот по нажатым клавишам и шаг головы"""
+        turns = TURN_TABLE[self.directions, actions]
+        turned = (actions > 0) & (turns != NO_TURN)
+        self.directions = np.where(turned, turns, self.directions)
+        steps = DIRECTIONS[self.directions]
+        step_size = np.where(turned, GRID_SIZE // 4, 1)[:, None]
+        limits = np.where(
+            turned[:, None],
+            (SCREEN_WIDTH - GRID_SIZE // 2, SCREEN_HEIGHT - GRID_SIZE // 2),
+            (SCREEN_WIDTH, SCREEN_HEIGHT)
+        )
+        self.heads = (self.heads + steps * step_size) % limits
+        if self.body_lengths.max() >= self.body.shape[1]:
+            self.grow_body()
+        capacity = self.body.shape[1]
+        self.head_slots = (self.head_slots - 1) % capacity
+        self.body[self.rows, self.head_slots] = self.pack(self.heads)
+        self.body_lengths += 1
+        popped = (
+            self.body_lengths // GRID_SIZE + 1 > self.lengths // GRID_SIZE
+        )
+        self.body_lengths -= popped
+
+    def selfbites(self):
+        """Маска игр, в которых голова попала в тело
+        дальше SELFBITE_OFFSET от головы
+        """
+        capacity = self.body.shape[1]
+        offsets = (np.arange(capacity) - self.head_slots[:, None]) % capacity
+        tail = (offsets >= SELFBITE_OFFSET) & (
+            offsets < self.body_lengths[:, None]
+        )
+        heads = self.body[self.rows, self.head_slots]
+        return ((self.body == heads[:, None]) & tail).any(axis=1)
+
+    def eat_snacks(self):
+        """Съедение яблок в порядке списка, как в Game.step"""
+        for snack in range(len(self.snack_powers)):
+            distance = ((self.snacks[:, snack] - self.heads) ** 2).sum(axis=1)
+            eaten = self.snacks_active[:, snack] & (distance < GRID_SIZE ** 2)
+            if not eaten.any():
+                continue
+            power = int(self.snack_powers[snack])
+            self.lengths[eaten] = np.maximum(
+                self.lengths[eaten] + power * GRID_SIZE, GRID_SIZE
+            )
+            if power < 0:
+                cut = np.minimum(
+                    abs(power) * GRID_SIZE,
+                    self.body_lengths[eaten] - GRID_SIZE
+                )
+                self.body_lengths[eaten] -= np.maximum(cut, 0)
+            self.affect_speed(eaten, power)
+            self.snacks[eaten, snack] = self.random_cells(
+                (int(eaten.sum()),)
+            )
+
+    def affect_speed(self, eaten, power):
+        """Изменение скорости после съедения яблока силы power"""
+        if power >= 0:
+            faster = eaten & ((self.lengths // GRID_SIZE) % 3 == 0)
+            self.speeds[faster] = np.minimum(
+                self.speeds[faster] + SPEED_DELTA, MAX_SPEED
+            )
+            return
+        self.speeds[eaten] = np.maximum(
+            self.speeds[eaten] - SPEED_DELTA, self.speed_mode
+        )
+
+    def step(self, actions=None):
+        """Один такт во всех играх.
+        actions - массив действий 0..4 длины num_games.
+        Возвращает (изменение длины в клетках, маска окончания игры).
+        """
+        if actions is None:
+            actions = np.zeros(self.num_games, dtype=np.int8)
+        before = self.lengths // GRID_SIZE
+        self.move(np.asarray(actions))
+        done = self.selfbites()
+        if done.any():
+            self.best_lengths = np.maximum(
+                self.best_lengths,
+                np.where(done, self.lengths // GRID_SIZE, 0)
+            )
+            self.reset(done)
+        self.eat_snacks()
+        reward = np.where(done, 0, self.lengths // GRID_SIZE - before)
+        return reward, done
@@ -0,0 +1,334 @@
+"""Бенчмарки горячих путей игрового цикла THE_SNAKE.
+
+Каждый замер - время одного вызова в микросекундах (лучшее из
+нескольких повторов) для разной длины змеи, числа ботов и яблок.
+Результаты пишутся в JSON и сравниваются с сохраненной базой:
+замедление больше допуска считается регрессией (код выхода 1).
+Вместе с замерами пишется время эталонной нагрузки на чистом Python
+(reference): если оно есть и в базе, времена сравниваются с поправкой
+на скорость машины. Базу без него можно сравнивать только на том же
+процессоре и версии Python, иначе сравнение пропускается.
+
+Примеры:
+    python benchmarks/hot_paths.py --output bench.json
+    python benchmarks/hot_paths.py --baseline benchmarks/baseline.json
+    python benchmarks/hot_paths.py --save-baseline benchmarks/baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import timeit
+from pathlib import Path
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import the_snake  # noqa: E402
+from bot_policies import path_planner  # noqa: E402
+from structures import Board  # noqa: E402
+from settings import (  # noqa: E402
+    BOT_COLORS, GRID_SIZE, GRID_HEIGHT, LEFT, RIGHT, SCREEN_WIDTH,
+    SNACK_COLORS, MOVEMENTS, PIXEL_MOVEMENT, CELL_MOVEMENT
+)
+
+
+SNAKE_LENGTHS = (10, 100, 300)
+BOT_COUNTS = (2, 8, 32)
+SNACK_COUNTS = (8, 32, 128)
+BOARD_SIZES = (22, 100, 500)
+POPULATIONS = (100, 300)
+POPULATION_BOARD = 200
+REPEATS = 5
+TOLERANCE = 0.25
+BASELINE = Path(__file__).resolve().parent / 'baseline.json'
+
+
+def make_game(
+        length=10, bots=2, snacks=8, seed=0, movement=PIXEL_MOVEMENT
+):
+    """Игра со змеей length клеток, bots ботами и snacks яблоками.
+    Змея уложена змейкой по строкам поля, чтобы не кусать себя.
+    """
+    game = the_snake.Game(seed=seed, movement=movement)
+    for index in range(len(game.bots), bots):
+        game.add_bot(BOT_COLORS[index % len(BOT_COLORS)], length=2)
+    for index in range(len(game.snacks), snacks):
+        game.add_snack(SNACK_COLORS[index % 7 - 3], power=index % 7 - 3)
+    snake = game.snake
+    pixels = length * GRID_SIZE
+    """Пиксельная змея - позиция на каждый пиксель пути,
+    клеточная - length + 1 клеток (с клеткой уходящего хвоста)
+    """
+    step, size = 1, pixels
+    if movement == CELL_MOVEMENT:
+        step, size = GRID_SIZE, length + 1
+        snake.band = length
+        snake.pushed = size
+    path = [
+        game.board.pack(
+            x if not row % 2 else SCREEN_WIDTH - step - x, row * GRID_SIZE
+        )
+        for row in range(GRID_HEIGHT)
+        for x in range(0, SCREEN_WIDTH, step)
+    ][:size]
+    snake.positions.reset(path[0])
+    for position in path[1:]:
+        snake.positions.push_head(position)
+    snake.length = pixels
+    snake.direction = LEFT if (pixels // SCREEN_WIDTH) % 2 else RIGHT
+    return game
+
+
+def bench_snake_move(length):
+    """Шаг змеи: новая голова и удаление хвоста"""
+    return make_game(length).snake.move
+
+
+def bench_selfbite(length):
+    """Проверка самоукуса головы"""
+    return make_game(length).handle_selfbite
+
+
+def bench_smash(bots):
+    """Проверка, не врезалась ли змея в каждого из ботов"""
+    game = make_game(bots=bots)
+
+    def run():
+        for bot in game.bots:
+            game.handle_smash(bot)
+    return run
+
+
+def bench_bot_capture(bots):
+    """Проверка захвата каждого из ботов змеей"""
+    game = make_game(length=100, bots=bots)
+
+    def run():
+        for bot in game.bots:
+            game.handle_bot_capture(bot)
+    return run
+
+
+def bench_eat_and_steal(snacks):
+    """Поиск съеденных и украденных яблок, как в Game.step"""
+    game = make_game(snacks=snacks)
+
+    def run():
+        head = game.snake.get_head_position()
+        for snack in game.get_near_snacks(head):
+            game.handle_eat_snack(snack)
+        for bot in game.bots:
+            for snack in game.get_near_snacks(bot.get_head_position()):
+                game.handle_steal_snack(bot, snack)
+    return run
+
+
+def bench_randomize_position(length):
+    """Перенос яблока на случайную свободную клетку"""
+    game = make_game(length)
+    return lambda: game.apple.randomize_position(game.free_cells)
+
+
+def bench_advance_cell(movement):
+    """Продвижение игры на одну клетку пути: GRID_SIZE тактов
+    пиксельной модели или один такт клеточной
+    """
+    game = make_game(length=100, bots=8, snacks=32, movement=movement)
+    ticks = GRID_SIZE // game.step_ticks
+
+    def run():
+        for _ in range(ticks):
+            game.step(())
+    return run
+
+
+def bench_new_game(size):
+    """Новая игра на поле size x size клеток"""
+    board = Board(size, size, GRID_SIZE)
+    return lambda: the_snake.Game(seed=0, board=board)
+
+
+def bench_bots_step(bots, batched_bots=True, policy=None):
+    """Такт игры с популяцией bots ботов на поле
+    POPULATION_BOARD x POPULATION_BOARD клеток
+    """
+    game = the_snake.Game(
+        seed=0,
+        board=Board(POPULATION_BOARD, POPULATION_BOARD, GRID_SIZE),
+        bot_count=bots,
+        batched_bots=batched_bots,
+        bot_policies=[policy] * bots if policy else None
+    )
+    return lambda: game.step(())
+
+
+def bench_bots_step_reference(bots):
+    """То же для эталонных ботов - отдельных змей"""
+    return bench_bots_step(bots, batched_bots=False)
+
+
+def bench_planner_step(bots):
+    """Такт игры, в которой все боты ищут путь к яблокам"""
+    return bench_bots_step(bots, policy=path_planner)
+
+
+def bench_frame(bots):
+    """Полный кадр: такт логики и отрисовка (dummy-драйвер видео)"""
+    game = make_game(length=100, bots=bots, snacks=32)
+    renderer = the_snake.Renderer()
+    game.bus.subscribe(renderer)
+    renderer.screen_refresh()
+    renderer.render(game)
+
+    def run():
+        game.step(())
+        renderer.render(game)
+    return run
+
+
+BENCHMARKS = (
+    ('snake_move', 'length', SNAKE_LENGTHS, bench_snake_move),
+    ('handle_selfbite', 'length', SNAKE_LENGTHS, bench_selfbite),
+    ('handle_smash', 'bots', BOT_COUNTS, bench_smash),
+    ('handle_bot_capture', 'bots', BOT_COUNTS, bench_bot_capture),
+    ('eat_and_steal_snacks', 'snacks', SNACK_COUNTS, bench_eat_and_steal),
+    ('randomize_position', 'length', SNAKE_LENGTHS, bench_randomize_position),
+    ('advance_cell', 'movement', MOVEMENTS, bench_advance_cell),
+    ('new_game', 'board', BOARD_SIZES, bench_new_game),
+    ('frame', 'bots', BOT_COUNTS, bench_frame),
+    ('bots_step', 'bots', POPULATIONS, bench_bots_step),
+    (
+        'bots_step_reference', 'bots', POPULATIONS,
+        bench_bots_step_reference
+    ),
+    ('planner_step', 'bots', POPULATIONS, bench_planner_step),
+)
+
+
+def processor_name():
+    """Модель процессора (в Linux platform.processor часто пуст)"""
+    try:
+        with open('/proc/cpuinfo', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith('model name'):
+                    return line.split(':', 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor()
+
+
+def reference_workload():
+    """Эталонная нагрузка, не зависящая от кода игры:
+    по ее времени оценивается скорость машины
+    """
+    data = list(range(2000))
+    counts = {}
+
+    def run():
+        for value in sorted(data, key=lambda value: -value):
+            counts[value % 97] = counts.get(value % 97, 0) + 1
+    return run
+
+
+def measure(function, repeats=REPEATS):
+    """Лучшее время одного вызова в микросекундах"""
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeats, number)) / number * 1e6
+
+
+def run_benchmarks(pattern=''):
+    """Все замеры, в имени которых есть pattern: {имя: мкс}"""
+    results = {}
+    for name, parameter, values, factory in BENCHMARKS:
+        for value in values:
+            key = f'{name}[{parameter}={value}]'
+            if pattern in key:
+                results[key] = round(measure(factory(value)), 3)
+    return results
+
+
+def baseline_scale(report, baseline):
+    """Поправка на скорость машины: во сколько раз эталонная
+    нагрузка в отчете report медленнее, чем в базе baseline.
+    Возвращает (поправка или None, если сравнивать нельзя, предупреждение).
+    """
+    if baseline.get('reference') and report.get('reference'):
+        return report['reference'] / baseline['reference'], ''
+    environment = ('python', 'machine', 'processor')
+    if any(report.get(key) != baseline.get(key) for key in environment):
+        return None, (
+            'База записана без эталонного замера и в другом или неизвестном '
+            'окружении: сравнение пропущено. Запишите базу на этой машине '
+            '(--save-baseline) с коммита без регрессий.'
+        )
+    return 1.0, (
+        'В базе нет эталонного замера: времена сравниваются как есть.'
+    )
+
+
+def compare(results, baseline, tolerance=TOLERANCE, scale=1.0):
+    """Строки отчета и список регрессий относительно базы.
+    scale - поправка на скорость машины (см. baseline_scale).
+    """
+    lines, regressions = [], []
+    for key, time in results.items():
+        base = baseline.get(key)
+        if base is None:
+            lines.append(f'{key:<42} {time:10.2f} мкс      (нет в базе)')
+            continue
+        ratio = time / (base * scale)
+        mark = ''
+        if ratio > 1 + tolerance:
+            mark = '  РЕГРЕССИЯ'
+            regressions.append(key)
+        lines.append(f'{key:<42} {time:10.2f} мкс  x{ratio:5.2f}{mark}')
+    return lines, regressions
+
+
+def main(argv=None):
+    """Запуск бенчмарков из командной строки"""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--filter', default='')
+    parser.add_argument('--output', default=None)
+    parser.add_argument('--baseline', default=None)
+    parser.add_argument('--save-baseline', default=None)
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE)
+    args = parser.parse_args(argv)
+    results = run_benchmarks(args.filter)
+    report = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'processor': processor_name(),
+        'unit': 'us',
+        'reference': round(measure(reference_workload()), 3),
+        'results': results,
+    }
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+    baseline, scale = {}, 1.0
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline_report = json.load(f)
+        scale, warning = baseline_scale(report, baseline_report)
+        if warning:
+            print(warning)
+        if scale is None:
+            baseline, scale = {}, 1.0
+        else:
+            baseline = baseline_report['results']
+    lines, regressions = compare(results, baseline, args.tolerance, scale)
+    print('\n'.join(lines))
+    if regressions:
+        print(f'Регрессий: {len(regressions)} (допуск {args.tolerance:.0%})')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
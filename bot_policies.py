@@ -0,0 +1,84 @@
+"""Стратегии поворотов змееботов.
+
+Стратегия - функция (game, index), которую Game вызывает для активного
+бота game.bots[index] на тактах его периода поворотов (turn_period).
+Она возвращает новое направление или None, если бот продолжает
+двигаться прямо.
+"""
+
+from settings import (
+    BOT_TURN_PERIODS, GRID_SIZE, PLANNER_WANDER_PERIOD, TURNS_BOT,
+    UP, DOWN, LEFT, RIGHT
+)
+
+
+def random_turns(game, index):
+    """Случайный поворот раз в BOT_TURN_PERIODS тактов"""
+    return game.rng.choice(TURNS_BOT[game.bots[index].direction])
+
+
+def snack_chaser(game, index):
+    """Поворот к ближайшему неспрятанному яблоку, как только
+    бот поравнялся с ним. Решение принимается раз за клетку пути.
+    """
+    bot = game.bots[index]
+    x, y = game.board.unpack(bot.get_head_position())
+    snacks = [
+        game.board.unpack(snack.position)
+        for snack in game.snacks if snack.is_active
+    ]
+    if not snacks:
+        return None
+    target_x, target_y = min(
+        snacks,
+        key=lambda position: (
+            (position[0] - x) ** 2 + (position[1] - y) ** 2
+        )
+    )
+    if bot.direction in (LEFT, RIGHT) and abs(target_x - x) < GRID_SIZE:
+        if target_y != y:
+            return DOWN if target_y > y else UP
+    if bot.direction in (UP, DOWN) and abs(target_y - y) < GRID_SIZE:
+        if target_x != x:
+            return RIGHT if target_x > x else LEFT
+    return None
+
+
+def path_planner(game, index):
+    """Поворот на кратчайший путь к ближайшему неспрятанному яблоку
+    по общим полям расстояний game.planner (см. planner.Planner).
+    Решение принимается раз за клетку пути. Если яблок рядом нет,
+    бот поворачивает случайно, когда срабатывает таймер
+    PLANNER_WANDER_PERIOD из game.bot_turns (см. bots.TurnSchedule.watch).
+    """
+    bot = game.bots[index]
+    direction = game.planner.direction(
+        bot.get_head_position(),
+        bot.direction,
+        [snack.position for snack in game.snacks if snack.is_active]
+    )
+    if direction is None:
+        if game.bot_turns.rang(PLANNER_WANDER_PERIOD):
+            return game.rng.choice(TURNS_BOT[bot.direction])
+        return None
+    return direction if direction != bot.direction else None
+
+
+def turn_period(policy, index):
+    """Период в тактах, на которых стратегию policy спрашивают
+    о повороте бота номер index, или None, если ее нужно спрашивать
+    каждый такт (см. bots.TurnSchedule)
+    """
+    if policy is random_turns:
+        return BOT_TURN_PERIODS[index % len(BOT_TURN_PERIODS)]
+    if policy is snack_chaser or policy is path_planner:
+        return GRID_SIZE
+    return None
+
+
+# Стратегии по именам (для турниров и запуска из командной строки)
+POLICIES = {
+    'random_turns': random_turns,
+    'snack_chaser': snack_chaser,
+    'path_planner': path_planner,
+}
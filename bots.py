@@ -0,0 +1,234 @@
+"""Популяция змееботов в виде структуры массивов.
+
+Состояние ботов, нужное каждому такту (головы, направления,
+отложенные повороты, длины, активность), хранится
+столбцами: i-й элемент каждого списка относится к боту с номером i.
+Такт обрабатывает столбцы одним проходом, а объекты ботов
+(ColumnBot) лишь читают и пишут свои ячейки столбцов.
+Поведение отдельной змеи the_snake.Snake остается эталоном:
+пакетный проход приводит к тому же состоянию игры.
+Когда спрашивать ботов о повороте, решает TurnSchedule - общий
+для ботов в столбцах и отдельных змей.
+"""
+
+from structures import Scheduler
+
+
+class TurnSchedule:
+    """Группы ботов по периодам поворотов. Стратегию бота
+    спрашивают о повороте только на тактах ее периода
+    (см. bot_policies.turn_period), а не опрашивают каждый такт.
+    """
+
+    def __init__(self):
+        """Пустое расписание"""
+        self.periods = []
+        """Номера ботов по периодам поворотов и боты, которых
+        нужно спрашивать о повороте каждый такт (период None).
+        У каждой группы свой периодический таймер: он отмечает
+        период в due_periods, когда группе пора поворачивать.
+        """
+        self.groups = {}
+        self.every_tick = []
+        self.scheduler = Scheduler()
+        self.timers = {}
+        self.due_periods = []
+        """Список номеров, который возвращает turning: он заполняется
+        заново на каждом такте и действителен до следующего вызова
+        """
+        self.due = []
+        """Таймеры периодов без группы ботов (см. watch) и периоды,
+        таймеры которых сработали на последнем такте turning
+        """
+        self.alarms = {}
+        self.rung = []
+
+    def add(self, period=None, after=0):
+        """Новый бот. Возвращает его номер.
+        period и after - как в set_period.
+        """
+        index = len(self.periods)
+        self.periods.append(None)
+        self.set_period(index, period, after)
+        return index
+
+    def set_period(self, index, period, after=0):
+        """Период поворотов бота в тактах или None - каждый такт.
+        after - последний такт, на котором повороты уже сделаны:
+        новая группа впервые поворачивает на кратном period такте позже.
+        """
+        old = self.periods[index]
+        group = self.every_tick if old is None else self.groups[old]
+        if index in group:
+            group.remove(index)
+            if old is not None and not group:
+                del self.groups[old]
+                Scheduler.cancel(self.timers.pop(old))
+        self.periods[index] = period
+        if period is None:
+            group = self.every_tick
+        elif period in self.groups:
+            group = self.groups[period]
+        else:
+            group = self.groups[period] = []
+            self.timers[period] = self.scheduler.every(
+                period, lambda: self.due_periods.append(period), after
+            )
+        group.append(index)
+        group.sort()
+
+    def watch(self, period):
+        """Таймер периода period, не связанный с группой ботов.
+        Стратегии узнают через rang, сработал ли он на этом такте.
+        """
+        if period not in self.alarms:
+            self.alarms[period] = self.scheduler.every(
+                period, lambda: self.rung.append(period)
+            )
+
+    def rang(self, period):
+        """Сработал ли таймер watch(period) на последнем такте turning"""
+        return period in self.rung
+
+    def turning(self, timer):
+        """Номера ботов по возрастанию, которых на такте timer
+        нужно спросить о повороте: таймер их группы сработал
+        или они спрашиваются всегда
+        """
+        self.rung.clear()
+        self.scheduler.run(timer)
+        due = self.due
+        due.clear()
+        due.extend(self.every_tick)
+        for period in self.due_periods:
+            due.extend(self.groups[period])
+        if len(self.due_periods) + bool(self.every_tick) > 1:
+            due.sort()
+        self.due_periods.clear()
+        return due
+
+
+class BotColumns:
+    """Столбцы состояния ботов"""
+
+    def __init__(self):
+        """Пустая популяция"""
+        self.heads = []
+        self.directions = []
+        self.next_directions = []
+        self.lengths = []
+        self.active = []
+        """Списки номеров и голов, которые возвращают методы такта.
+        Они заполняются заново на каждом такте, чтобы такт не создавал
+        новых списков: результат действителен до следующего вызова.
+        """
+        self.moving = []
+        self.new_heads = []
+
+    def __len__(self):
+        """Количество ботов"""
+        return len(self.heads)
+
+    def add(self, head):
+        """Новый бот с головой head. Возвращает его номер."""
+        index = len(self.heads)
+        self.heads.append(head)
+        self.directions.append(None)
+        self.next_directions.append(None)
+        self.lengths.append(0)
+        self.active.append(True)
+        return index
+
+    def active_indexes(self):
+        """Номера активных ботов по возрастанию"""
+        indexes = self.moving
+        indexes.clear()
+        for index, active in enumerate(self.active):
+            if active:
+                indexes.append(index)
+        return indexes
+
+    def next_heads(
+            self, indexes, width, height, step, turn_step, turn_margin
+    ):
+        """Шаг голов ботов с номерами indexes по правилам
+        Snake.get_new_head_position: отложенный поворот делается шагом
+        turn_step по полю, уменьшенному на turn_margin, прямой ход -
+        шагом step. Головы - позиции y * width + x на поле width x height
+        пикселей. Возвращает новые головы в том же порядке.
+        """
+        heads = self.heads
+        directions = self.directions
+        next_directions = self.next_directions
+        turn_width, turn_height = width - turn_margin, height - turn_margin
+        new_heads = self.new_heads
+        new_heads.clear()
+        for index in indexes:
+            head = heads[index]
+            x, y = head % width, head // width
+            turn = next_directions[index]
+            if turn:
+                directions[index] = turn
+                next_directions[index] = None
+                head = (
+                    (y + turn[1] * turn_step) % turn_height * width
+                    + (x + turn[0] * turn_step) % turn_width
+                )
+            else:
+                dx, dy = directions[index]
+                head = (
+                    (y + dy * step) % height * width + (x + dx * step) % width
+                )
+            heads[index] = head
+            new_heads.append(head)
+        return new_heads
+
+
+def column(name):
+    """Атрибут бота, хранящийся в столбце name его популяции"""
+    def get(bot):
+        return getattr(bot.columns, name)[bot.index]
+
+    def put(bot, value):
+        getattr(bot.columns, name)[bot.index] = value
+
+    return property(get, put, doc=f'Ячейка бота в столбце {name}')
+
+
+class ColumnBot:
+    """Примесь к классу змеи (the_snake.Snake или CellSnake):
+    направления, длина и активность бота лежат в столбцах BotColumns,
+    а голова копируется в столбец heads после каждого шага и сброса.
+    Тело бота остается обычным SnakeBody: на него подписаны сетки
+    столкновений и свободных клеток. Слоты columns и index объявляют
+    классы ботов: у примеси своих слотов нет.
+    """
+
+    __slots__ = ()
+
+    direction = column('directions')
+    next_direction = column('next_directions')
+    length = column('lengths')
+    is_active = column('active')
+
+    def __init__(self, columns, *args, **kwargs):
+        """Бот занимает новую строку столбцов columns,
+        остальные аргументы - как у змеи
+        """
+        self.columns = columns
+        self.index = columns.add(None)
+        super().__init__(*args, **kwargs)
+
+    def body_offsets(self):
+        """Тело бота не проверяют со смещением: индекс не нужен"""
+        return ()
+
+    def reset(self, free_cells=None):
+        """Сброс змеи и ее головы в столбце heads"""
+        super().reset(free_cells)
+        self.columns.heads[self.index] = self.positions.head()
+
+    def advance(self, head):
+        """Шаг змеи и ее головы в столбце heads"""
+        super().advance(head)
+        self.columns.heads[self.index] = head
@@ -0,0 +1,82 @@
+"""Шина событий игры THE_SNAKE.
+
+Логика игры (Game) только добавляет события такта в список,
+а отрисовка, статистика, запись и хранилище результатов подписываются
+на нужные им виды событий. Доставка идет пачкой раз за такт:
+подписчик получает только свои события и только на тактах, где они
+были, поэтому новые подписчики не добавляют работы пустым тактам.
+"""
+
+from collections import namedtuple
+
+from settings import EVENT_KINDS
+
+
+# Событие такта: вид из EVENT_KINDS и данные события
+Event = namedtuple('Event', 'kind data')
+
+
+class EventBus:
+    """Подписчики событий Game.
+    Подписчик - объект с методом notify(game, events). Его атрибут
+    kinds - виды нужных ему событий; без него (или с None) подписчик
+    получает все события каждого такта, даже пустой список.
+    """
+
+    def __init__(self):
+        """Шина без подписчиков"""
+        self.subscribers = []
+        self.kinds = []
+        self.every_tick = []
+        self.by_kind = {}
+        """Пачки подписчиков (по номеру подписки): списки очищаются
+        после доставки и служат следующим тактам
+        """
+        self.batches = []
+
+    def __len__(self):
+        """Количество подписчиков"""
+        return len(self.subscribers)
+
+    def __contains__(self, subscriber):
+        """Подписан ли subscriber"""
+        return subscriber in self.subscribers
+
+    def subscribe(self, subscriber):
+        """Подписка на виды событий subscriber.kinds. Порядок подписки
+        - порядок доставки: например, результаты сохраняются
+        до того, как отрисовка закроет окно по событию QUIT.
+        """
+        kinds = getattr(subscriber, 'kinds', None)
+        unknown = set(kinds or ()) - set(EVENT_KINDS)
+        if unknown:
+            raise ValueError(f'Неизвестные виды событий: {sorted(unknown)}')
+        position = len(self.subscribers)
+        self.subscribers.append(subscriber)
+        self.kinds.append(kinds)
+        self.batches.append([])
+        if kinds is None:
+            self.every_tick.append(subscriber)
+        for kind in kinds or ():
+            self.by_kind.setdefault(kind, []).append(position)
+        return subscriber
+
+    def publish(self, game, events):
+        """Доставка событий такта подписчикам. Пачка действительна
+        только во время notify: подписчик не хранит ее, а копирует.
+        """
+        if not events:
+            for subscriber in self.every_tick:
+                subscriber.notify(game, events)
+            return
+        batches = self.batches
+        for event in events:
+            for position in self.by_kind.get(event[0], ()):
+                batches[position].append(event)
+        for position, subscriber in enumerate(self.subscribers):
+            batch = batches[position]
+            if batch:
+                subscriber.notify(game, batch)
+                batch.clear()
+            elif self.kinds[position] is None:
+                subscriber.notify(game, events)
@@ -0,0 +1,90 @@
+"""Поиск пути змееботов к яблокам по полям расстояний.
+
+Поле расстояний яблока - число шагов по клеткам от каждой клетки
+поля-тора до клетки яблока (поиск в ширину с тем же переходом через
+края, что и в Snake.get_new_head_position). Поле строится только
+в радиусе PLANNER_RADIUS клеток, поэтому его цена не зависит
+от размера поля. Поля кэшируются по клетке яблока и общие для всех
+ботов: новое поле считается, только когда яблоко переместилось.
+"""
+
+from settings import PLANNER_RADIUS, TURNS_BOT, UP, DOWN, LEFT, RIGHT
+
+
+class Planner:
+    """Кэш полей расстояний до яблок на поле board (см. structures.Board)"""
+
+    def __init__(self, board, radius=PLANNER_RADIUS):
+        """Пустой кэш: поля считаются при первом запросе"""
+        self.board = board
+        self.radius = radius
+        self.fields = {}
+        self.hits = 0
+        self.misses = 0
+
+    def cell_of(self, position):
+        """Номер клетки y * width + x, ближайшей к позиции"""
+        board = self.board
+        half = board.cell_size // 2
+        x, y = position % board.pixel_width, position // board.pixel_width
+        return (
+            (y + half) // board.cell_size % board.height * board.width
+            + (x + half) // board.cell_size % board.width
+        )
+
+    def neighbour(self, cell, direction):
+        """Соседняя клетка по направлению с переходом через край"""
+        width, height = self.board.width, self.board.height
+        x, y = cell % width, cell // width
+        return (
+            (y + direction[1]) % height * width + (x + direction[0]) % width
+        )
+
+    def distance_field(self, cell):
+        """Поиск в ширину от клетки cell: {клетка: шагов до cell}
+        для клеток не дальше radius шагов
+        """
+        field = {cell: 0}
+        frontier = [cell]
+        for distance in range(1, self.radius + 1):
+            reached = []
+            for current in frontier:
+                for direction in (UP, DOWN, LEFT, RIGHT):
+                    other = self.neighbour(current, direction)
+                    if other not in field:
+                        field[other] = distance
+                        reached.append(other)
+            frontier = reached
+        return field
+
+    def field(self, cell, targets):
+        """Поле расстояний до клетки cell из кэша. При промахе
+        из кэша уходят поля клеток, которых нет среди targets.
+        """
+        field = self.fields.get(cell)
+        if field is not None:
+            self.hits += 1
+            return field
+        self.misses += 1
+        for old_cell in list(self.fields):
+            if old_cell not in targets:
+                del self.fields[old_cell]
+        field = self.fields[cell] = self.distance_field(cell)
+        return field
+
+    def direction(self, position, direction, targets):
+        """Направление из TURNS_BOT[direction] к ближайшей из позиций
+        targets. При равенстве остается текущее направление.
+        None - ни одна цель не ближе radius шагов.
+        """
+        cells = {self.cell_of(target) for target in targets}
+        fields = [self.field(cell, cells) for cell in cells]
+        start = self.cell_of(position)
+        best, best_distance = None, self.radius + 1
+        for turn in TURNS_BOT[direction]:
+            cell = self.neighbour(start, turn)
+            for field in fields:
+                distance = field.get(cell, best_distance)
+                if distance < best_distance:
+                    best, best_distance = turn, distance
+        return best
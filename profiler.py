@@ -0,0 +1,108 @@
+"""Профайлер фаз игрового цикла THE_SNAKE.
+
+Фаза замеряется блоком with profiler.phase('имя'). Выключенный
+профайлер отдает общий пустой контекст, поэтому замеры почти
+ничего не стоят. Включенный хранит последние PROFILER_WINDOW
+длительностей каждой фазы (для p50/p99) и события для экспорта
+в формат Chrome trace-event (chrome://tracing, Perfetto).
+"""
+
+import json
+from collections import deque
+from contextlib import nullcontext
+from time import perf_counter
+
+from settings import PROFILER_WINDOW, PROFILER_TRACE_LIMIT
+
+
+NO_PHASE = nullcontext()
+
+
+class Phase:
+    """Замер одной фазы: время от входа в блок до выхода"""
+
+    def __init__(self, profiler, name):
+        """Фаза name профайлера profiler"""
+        self.profiler = profiler
+        self.name = name
+        self.start = None
+
+    def __enter__(self):
+        """Начало фазы"""
+        self.start = self.profiler.clock()
+        return self
+
+    def __exit__(self, *exc_info):
+        """Конец фазы: длительность уходит в профайлер"""
+        self.profiler.add(
+            self.name, self.start, self.profiler.clock() - self.start
+        )
+
+
+class Profiler:
+    """Скользящие длительности фаз и события для трассировки"""
+
+    def __init__(
+            self, window=PROFILER_WINDOW, trace_limit=PROFILER_TRACE_LIMIT,
+            clock=perf_counter
+    ):
+        """Источник времени clock возвращает секунды"""
+        self.enabled = False
+        self.window = window
+        self.clock = clock
+        self.origin = clock()
+        self.samples = {}
+        self.trace = deque(maxlen=trace_limit)
+        self.trace_path = None
+
+    def phase(self, name):
+        """Контекст для замера фазы name"""
+        if not self.enabled:
+            return NO_PHASE
+        return Phase(self, name)
+
+    def add(self, name, start, duration):
+        """Учет длительности фазы, начавшейся в момент start"""
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = self.samples[name] = deque(maxlen=self.window)
+        samples.append(duration)
+        self.trace.append((name, start, duration))
+
+    def percentiles(self, name, quantiles=(0.5, 0.99)):
+        """Квантили длительности фазы в секундах (ближайший ранг)"""
+        samples = sorted(self.samples.get(name, ()))
+        if not samples:
+            return tuple(0 for _ in quantiles)
+        return tuple(
+            samples[min(int(quantile * len(samples)), len(samples) - 1)]
+            for quantile in quantiles
+        )
+
+    def summary(self):
+        """Строки (фаза, p50, p99) в миллисекундах"""
+        return [
+            (name, *(value * 1000 for value in self.percentiles(name)))
+            for name in self.samples
+        ]
+
+    def trace_events(self):
+        """События в формате Chrome trace-event (время в мкс)"""
+        return {
+            'traceEvents': [
+                {
+                    'name': name, 'cat': 'the_snake', 'ph': 'X',
+                    'ts': round((start - self.origin) * 1e6, 3),
+                    'dur': round(duration * 1e6, 3),
+                    'pid': 1, 'tid': 1,
+                }
+                for name, start, duration in self.trace
+            ],
+            'displayTimeUnit': 'ms',
+        }
+
+    def export_trace(self, path=None):
+        """Запись трассировки в JSON-файл path (или trace_path)"""
+        path = path or self.trace_path
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.trace_events(), f)
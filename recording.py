@@ -0,0 +1,117 @@
+"""Запись нажатий THE_SNAKE для точного повтора игры.
+
+Файл записи - заголовок (метка, версия, зерно Game, индекс модели
+движения в MOVEMENTS, размеры поля в клетках и количество ботов), затем
+по 5 байт на нажатие: номер такта и индекс клавиши в RECORDED_KEYS.
+Последняя запись - такт выхода с индексом END и хэш состояния
+игры (Game.state_hash) на этом такте.
+"""
+
+import struct
+from collections import namedtuple
+
+from settings import (
+    KEY_PRESSED, QUIT, K_UP, K_DOWN, K_LEFT, K_RIGHT, K_1, K_2, K_3, K_4,
+    K_ESCAPE, MOVEMENTS, PIXEL_MOVEMENT, BOARD_WIDTH, BOARD_HEIGHT, BOT_COUNT
+)
+
+
+MAGIC = b'SNKR'
+VERSION = 1
+HEADER = struct.Struct('<4sBQBHHH')
+EVENT = struct.Struct('<IB')
+HASH_SIZE = 32
+END = 255
+# Клавиши, на которые реагирует Game: остальные не записываются
+RECORDED_KEYS = (
+    K_UP, K_DOWN, K_LEFT, K_RIGHT, K_1, K_2, K_3, K_4, K_ESCAPE
+)
+KEY_INDEXES = {key: index for index, key in enumerate(RECORDED_KEYS)}
+
+
+# Прочитанная запись: board - размеры поля в клетках (ширина, высота),
+# bots - количество ботов
+Recording = namedtuple(
+    'Recording', 'seed movement board bots keys last_tick state_hash'
+)
+
+
+class RecordingError(Exception):
+    """Файл записи поврежден или другой версии"""
+
+
+class Recorder:
+    """Подписчик событий Game, который пишет нажатия в файл.
+    Файл закрывается с хэшем состояния при выходе из игры.
+    """
+
+    kinds = (KEY_PRESSED, QUIT)
+
+    def __init__(
+            self, path, seed, movement=PIXEL_MOVEMENT, board=None,
+            bot_count=BOT_COUNT
+    ):
+        """Зерно seed, модель движения movement, поле board
+        и количество ботов bot_count - те, с которыми создана Game
+        """
+        width, height = (
+            (board.width, board.height) if board
+            else (BOARD_WIDTH, BOARD_HEIGHT)
+        )
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(
+            MAGIC, VERSION, seed, MOVEMENTS.index(movement),
+            width, height, bot_count
+        ))
+
+    def notify(self, game, events):
+        """Записывает нажатия такта, на выходе - хэш состояния"""
+        for kind, key in events:
+            if kind == KEY_PRESSED and key in KEY_INDEXES:
+                self.file.write(EVENT.pack(game.timer, KEY_INDEXES[key]))
+            elif kind == QUIT:
+                self.close(game)
+
+    def close(self, game):
+        """Запись такта выхода и хэша состояния, закрытие файла"""
+        if self.file.closed:
+            return
+        self.file.write(EVENT.pack(game.timer, END))
+        self.file.write(game.state_hash())
+        self.file.close()
+
+
+def read_header(data, path):
+    """Заголовок записи: (зерно, модель движения, поле, количество
+    ботов, смещение первого нажатия)
+    """
+    if len(data) < HEADER.size:
+        raise RecordingError(f'{path}: нет заголовка записи')
+    magic, version, seed, index, width, height, bots = HEADER.unpack_from(
+        data
+    )
+    if magic != MAGIC or version != VERSION:
+        raise RecordingError(f'{path}: неизвестный формат записи')
+    if index >= len(MOVEMENTS):
+        raise RecordingError(f'{path}: неизвестная модель движения')
+    return seed, MOVEMENTS[index], (width, height), bots, HEADER.size
+
+
+def read_recording(path):
+    """Чтение записи в Recording. Клавиши - словарь {такт: [клавиши]}."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    seed, movement, board, bots, offset = read_header(data, path)
+    keys = {}
+    while offset + EVENT.size <= len(data):
+        tick, index = EVENT.unpack_from(data, offset)
+        offset += EVENT.size
+        if index == END:
+            state_hash = data[offset:offset + HASH_SIZE]
+            if len(state_hash) != HASH_SIZE:
+                break
+            return Recording(
+                seed, movement, board, bots, keys, tick, state_hash
+            )
+        keys.setdefault(tick, []).append(RECORDED_KEYS[index])
+    raise RecordingError(f'{path}: запись оборвана до выхода из игры')
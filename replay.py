@@ -0,0 +1,55 @@
+"""Повтор записанной игры THE_SNAKE без окна и на максимальной скорости.
+
+Игра создается с зерном из записи, нажатия подаются в те же такты,
+а в конце хэш состояния сравнивается с записанным.
+
+Пример:
+    python the_snake.py --record game.rec
+    python replay.py game.rec
+"""
+
+import argparse
+import sys
+from time import perf_counter
+
+from recording import read_recording
+from settings import GRID_SIZE
+from structures import Board
+from the_snake import Game
+
+
+def replay(path):
+    """Повтор игры из файла path.
+    Возвращает (игра, совпал ли хэш состояния с записанным).
+    """
+    recording = read_recording(path)
+    game = Game(
+        seed=recording.seed, movement=recording.movement,
+        board=Board(*recording.board, GRID_SIZE),
+        bot_count=recording.bots
+    )
+    game.hide_extras()
+    keys = recording.keys
+    while game.timer < recording.last_tick:
+        game.step(keys.get(game.timer + game.step_ticks, ()))
+    return game, game.state_hash() == recording.state_hash
+
+
+def main(argv=None):
+    """Повтор из командной строки. Код выхода 1, если хэш не совпал."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('path')
+    args = parser.parse_args(argv)
+    start = perf_counter()
+    game, matched = replay(args.path)
+    seconds = perf_counter() - start
+    print(
+        f'Тактов: {game.timer} за {seconds:.2f} с '
+        f'({game.timer / seconds:.0f} тактов/с). '
+        f'Хэш состояния: {"совпал" if matched else "НЕ СОВПАЛ"}.'
+    )
+    return 0 if matched else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,242 @@
+"""Хранилище результатов игр THE_SNAKE.
+
+Игровой цикл только кладет результаты в ограниченную очередь.
+Фоновый поток-писатель забирает их и пишет в SQLite пачками
+по RESULTS_BATCH_SIZE записей, неполную пачку - после паузы
+RESULTS_FLUSH_INTERVAL, а остаток - при закрытии хранилища
+или выходе из программы. Для таблицы рекордов есть индекс
+по режиму и длине змеи. Ошибку писателя flush и close передают
+вызывающему как ResultsError, а подписчик событий лишь сообщает о ней.
+"""
+
+import atexit
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import namedtuple
+from queue import Empty, Full, Queue
+
+from settings import (
+    GAME_OVER, MODE_SWITCH, QUIT, RESULTS_PATH, RESULTS_BATCH_SIZE,
+    RESULTS_QUEUE_SIZE, RESULTS_FLUSH_INTERVAL
+)
+
+
+Result = namedtuple(
+    'Result', ('timestamp', 'length', 'speed_level', 'mode', 'captures')
+)
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS results ('
+    ' id INTEGER PRIMARY KEY,'
+    ' timestamp REAL NOT NULL,'
+    ' length INTEGER NOT NULL,'
+    ' speed_level INTEGER NOT NULL,'
+    ' mode TEXT NOT NULL,'
+    ' captures INTEGER NOT NULL DEFAULT 0'
+    ')',
+    'CREATE INDEX IF NOT EXISTS results_mode_length'
+    ' ON results (mode, length DESC)',
+    'CREATE INDEX IF NOT EXISTS results_timestamp ON results (timestamp)',
+)
+INSERT = (
+    'INSERT INTO results (timestamp, length, speed_level, mode, captures)'
+    ' VALUES (?, ?, ?, ?, ?)'
+)
+# Команда остановки писателю в очереди наряду с результатами.
+# Запрос flush - threading.Event, который писатель взводит после записи.
+STOP = 'stop'
+
+
+class ResultsError(Exception):
+    """Писатель не смог сохранить результаты"""
+
+
+def connect(path):
+    """Подключение к базе результатов с созданием таблицы"""
+    connection = sqlite3.connect(path)
+    with connection:
+        for statement in SCHEMA:
+            connection.execute(statement)
+    return connection
+
+
+class ResultsStore:
+    """Хранилище результатов в SQLite с фоновым потоком-писателем.
+    Заодно подписчик событий Game (см. events): сохраняет результат
+    при окончании игры и смене режима и закрывается при выходе.
+    """
+
+    kinds = (GAME_OVER, MODE_SWITCH, QUIT)
+
+    def __init__(
+            self, path=RESULTS_PATH, batch_size=RESULTS_BATCH_SIZE,
+            queue_size=RESULTS_QUEUE_SIZE,
+            flush_interval=RESULTS_FLUSH_INTERVAL
+    ):
+        """Файл базы и поток-писатель создаются при первой записи"""
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = Queue(maxsize=queue_size)
+        self.writer = None
+        self.reader = None
+        self.error = None
+
+    def notify(self, game, events):
+        """Сохраняет результат при окончании игры и смене режима.
+        Несохраненные результаты записываются перед выходом.
+        Ошибка записи выводится в stderr, чтобы не прерывать раздачу
+        события остальным подписчикам.
+        """
+        for kind, result in events:
+            if kind == QUIT:
+                try:
+                    self.close()
+                except ResultsError as error:
+                    print(error, file=sys.stderr)
+            elif result:
+                length, speed_level, mode = result
+                self.add(length, speed_level, mode, game.bot_capture_amount)
+
+    def add(self, length, speed_level, mode, captures=0, timestamp=None):
+        """Передает результат писателю. Файлов не трогает;
+        ждет, только если очередь переполнена. Упавший писатель
+        запускается заново. Пока писатель запущен, хранилище
+        закрывается и при выходе из программы.
+        """
+        if self.writer is None:
+            atexit.register(self.close)
+        if self.writer is None or not self.writer.is_alive():
+            self.writer = threading.Thread(
+                target=self.write_loop, name='results-writer', daemon=True
+            )
+            self.writer.start()
+        if not self.put(Result(
+            time.time() if timestamp is None else timestamp,
+            length, speed_level, mode, captures
+        )):
+            self.check()
+
+    def put(self, item):
+        """Кладет item в очередь, пока писатель жив.
+        False - писатель остановился раньше.
+        """
+        while self.writer.is_alive():
+            try:
+                self.queue.put(item, timeout=self.flush_interval)
+                return True
+            except Full:
+                pass
+        return False
+
+    def write_loop(self):
+        """Поток-писатель. Исключение, остановившее его,
+        запоминается для flush и close.
+        """
+        try:
+            self.write_until_stop()
+        except Exception as error:
+            self.error = error
+
+    def write_until_stop(self):
+        """Копит результаты и пишет их пачками до команды STOP"""
+        connection = None
+        pending = []
+        while True:
+            try:
+                item = self.queue.get(timeout=self.flush_interval)
+            except Empty:
+                item = None
+            if isinstance(item, Result):
+                pending.append(item)
+                if len(pending) < self.batch_size:
+                    continue
+            connection = self.write_batch(connection, pending)
+            pending = []
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item == STOP:
+                if connection is not None:
+                    connection.close()
+                return
+
+    def write_batch(self, connection, batch):
+        """Пишет пачку одной транзакцией. Возвращает подключение."""
+        if not batch:
+            return connection
+        try:
+            connection = connection or connect(self.path)
+            with connection:
+                connection.executemany(INSERT, batch)
+        except sqlite3.Error as error:
+            self.error = error
+        return connection
+
+    def check(self):
+        """ResultsError, если писатель не смог что-то записать"""
+        error, self.error = self.error, None
+        if error is not None:
+            raise ResultsError(
+                f'{self.path}: результаты не записаны: {error}'
+            ) from error
+
+    def flush(self):
+        """Ждет, пока писатель запишет все переданные результаты,
+        но не дольше, чем он жив
+        """
+        if self.writer is not None:
+            done = threading.Event()
+            if self.put(done):
+                while (
+                    not done.wait(self.flush_interval)
+                    and self.writer.is_alive()
+                ):
+                    pass
+        self.check()
+
+    def close(self):
+        """Запись остатка, остановка писателя и закрытие базы"""
+        atexit.unregister(self.close)
+        if self.writer is not None:
+            self.put(STOP)
+            self.writer.join()
+        self.writer = None
+        if self.reader is not None:
+            self.reader.close()
+            self.reader = None
+        self.check()
+
+    def query(self, sql, parameters=()):
+        """Запрос к базе с учетом еще не записанных результатов"""
+        self.flush()
+        if self.reader is None:
+            if not os.path.exists(self.path):
+                return []
+            self.reader = connect(self.path)
+        return self.reader.execute(sql, parameters).fetchall()
+
+    def leaderboard(self, mode=None, limit=10):
+        """Лучшие результаты (по длине, затем по времени) для режима
+        mode или для всех режимов
+        """
+        sql = (
+            'SELECT timestamp, length, speed_level, mode, captures'
+            ' FROM results'
+        )
+        parameters = ()
+        if mode is not None:
+            sql += ' WHERE mode = ?'
+            parameters = (mode,)
+        sql += ' ORDER BY length DESC, timestamp LIMIT ?'
+        return [
+            Result(*row) for row in self.query(sql, parameters + (limit,))
+        ]
+
+    def best_results(self):
+        """Рекорды по режимам: {режим: длина}"""
+        return dict(self.query(
+            'SELECT mode, MAX(length) FROM results GROUP BY mode'
+        ))
@@ -1,7 +1,5 @@
 """Модуль, содержащий константы и переменные проекта THE_SNAKE"""
 
-import pygame as pg
-
 
 # Размеры экрана и сетки
 GRID_SIZE = 40
@@ -10,21 +8,39 @@ GRID_HEIGHT = 16
 SCREEN_WIDTH = GRID_WIDTH * GRID_SIZE
 SCREEN_HEIGHT = GRID_HEIGHT * GRID_SIZE
 CENTER = (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
+# Размеры игрового поля в клетках (по умолчанию - как у окна).
+# Если поле больше окна, камера следит за змеей и сдвигается,
+# когда голова подходит к краю окна ближе CAMERA_MARGIN клеток
+BOARD_WIDTH = GRID_WIDTH
+BOARD_HEIGHT = GRID_HEIGHT
+CAMERA_MARGIN = 3
 # Координаты направлений движения
 UP = (0, -1)
 DOWN = (0, 1)
 LEFT = (-1, 0)
 RIGHT = (1, 0)
+# Коды клавиш SDL, те же, что pygame.K_*: так settings
+# импортируется без pygame
+K_UP = 1073741906
+K_DOWN = 1073741905
+K_LEFT = 1073741904
+K_RIGHT = 1073741903
+K_1 = 49
+K_2 = 50
+K_3 = 51
+K_4 = 52
+K_5 = 53
+K_ESCAPE = 27
 # Правила для поворотов змейки при нажатии на стрелки
 TURNS = {
-    (LEFT, pg.K_UP): UP,
-    (RIGHT, pg.K_UP): UP,
-    (LEFT, pg.K_DOWN): DOWN,
-    (RIGHT, pg.K_DOWN): DOWN,
-    (UP, pg.K_LEFT): LEFT,
-    (DOWN, pg.K_LEFT): LEFT,
-    (UP, pg.K_RIGHT): RIGHT,
-    (DOWN, pg.K_RIGHT): RIGHT
+    (LEFT, K_UP): UP,
+    (RIGHT, K_UP): UP,
+    (LEFT, K_DOWN): DOWN,
+    (RIGHT, K_DOWN): DOWN,
+    (UP, K_LEFT): LEFT,
+    (DOWN, K_LEFT): LEFT,
+    (UP, K_RIGHT): RIGHT,
+    (DOWN, K_RIGHT): RIGHT
 }
 # Правила поворотов для змеебота
 TURNS_BOT = {
@@ -33,6 +49,23 @@ TURNS_BOT = {
     UP: (UP, LEFT, RIGHT),
     DOWN: (DOWN, LEFT, RIGHT)
 }
+# Модели движения: по пикселю за такт (исходная) или по клетке за такт
+PIXEL_MOVEMENT = 'pixel'
+CELL_MOVEMENT = 'cell'
+MOVEMENTS = (PIXEL_MOVEMENT, CELL_MOVEMENT)
+# Количество змееботов в игре по умолчанию
+BOT_COUNT = 2
+# Захваченный бот возвращается на первом такте, кратном этому периоду
+BOT_REVIVAL_PERIOD = 2000
+# Яблоко, не поместившееся на заполненное поле, пробует встать снова
+# через столько тактов
+SNACK_RETRY_PERIOD = GRID_SIZE
+# Периоды (в тактах) случайных поворотов ботов
+BOT_TURN_PERIODS = (140, 200)
+# Радиус (в клетках) полей расстояний до яблок у ботов path_planner
+# и период (в тактах) их случайных поворотов, когда яблок рядом нет
+PLANNER_RADIUS = 20
+PLANNER_WANDER_PERIOD = GRID_SIZE * 5
 # Цвета в формате RGB
 BOARD_BACKGROUND_COLOR = (27, 27, 30)
 STEALTH_COLOR = (0, 0, 0, 0)
@@ -57,10 +90,22 @@ SPEED_DELTA = 20
 EASY_START_SPEED = 200
 HARD_START_SPEED = EASY_START_SPEED * 2
 MAX_SPEED = 800
+# Частота кадров отрисовки (логика идет со скоростью змеи)
+RENDER_FPS = 60
+# Сколько тактов логики можно догнать за один кадр
+MAX_STEPS_PER_FRAME = 32
+# Не чаще скольких раз в секунду обновлять заголовок окна и надписи
+HUD_MAX_REFRESH_RATE = 20
+# Профайлер фаз: сколько последних замеров фазы учитывать в p50/p99
+# и сколько событий хранить для экспорта трассировки
+PROFILER_WINDOW = 600
+PROFILER_TRACE_LIMIT = 200_000
+# Сколько отрисованных надписей хранит кэш текста
+TEXT_CACHE_SIZE = 64
 # Правила переключения режимов скорости
 MODES_SWITCH_RULES = {
-    (EASY_START_SPEED, pg.K_2): HARD_START_SPEED,
-    (HARD_START_SPEED, pg.K_1): EASY_START_SPEED
+    (EASY_START_SPEED, K_2): HARD_START_SPEED,
+    (HARD_START_SPEED, K_1): EASY_START_SPEED
 }
 EASY = 'ИЗИ'
 HARD = 'ХАРД'
@@ -68,3 +113,25 @@ MODES_DISPLAY = {
     EASY_START_SPEED: EASY,
     HARD_START_SPEED: HARD
 }
+# События, которые Game.step передает подписчикам (см. events)
+SCREEN_REFRESH = 'screen_refresh'
+CELLS_ERASED = 'cells_erased'
+SNACK_EATEN = 'snack_eaten'
+SNACK_STOLEN = 'snack_stolen'
+BOT_CAPTURED = 'bot_captured'
+GAME_OVER = 'game_over'
+MODE_SWITCH = 'mode_switch'
+QUIT = 'quit'
+KEY_PRESSED = 'key_pressed'
+PROFILER_TOGGLE = 'profiler_toggle'
+EVENT_KINDS = (
+    SCREEN_REFRESH, CELLS_ERASED, SNACK_EATEN, SNACK_STOLEN, BOT_CAPTURED,
+    GAME_OVER, MODE_SWITCH, QUIT, KEY_PRESSED, PROFILER_TOGGLE
+)
+# Хранилище результатов: файл SQLite и размер пачки записей
+RESULTS_PATH = 'results.sqlite3'
+RESULTS_BATCH_SIZE = 16
+# Очередь фонового писателя результатов и пауза (с), после которой
+# неполная пачка все равно записывается
+RESULTS_QUEUE_SIZE = 256
+RESULTS_FLUSH_INTERVAL = 1
@@ -0,0 +1,504 @@
+"""Структуры данных для игровых объектов THE_SNAKE.
+
+Позиция на поле - пиксель, упакованный в одно число
+y * pixel_width + x (см. Board.pack): тела змей, индексы и проверки
+столкновений не создают пар координат, а пары появляются только
+при отрисовке (Board.unpack).
+"""
+
+import random
+from collections import Counter, deque
+from heapq import heappop, heappush
+from itertools import islice
+from math import ceil
+
+
+# Запас ячеек SpatialHash по краям строки: столько ячеек за краем
+# поля можно просматривать, не задевая ячейки соседней строки
+HASH_PADDING = 2
+# Пустой результат SpatialHash.query: без попаданий множество не создается
+NOTHING_FOUND = frozenset()
+
+
+class BoardFullError(Exception):
+    """На поле не осталось ни одной свободной клетки"""
+
+
+def discard_one(counts, key):
+    """Уменьшает счетчик ключа и удаляет ключ, когда счетчик обнулился"""
+    count = counts[key] - 1
+    if count:
+        counts[key] = count
+    else:
+        del counts[key]
+
+
+class OccupancyIndex:
+    """Мультимножество позиций тела: позиция -> количество вхождений.
+    Для каждого смещения offset отдельно считаются позиции
+    первых offset элементов, поэтому проверка вида
+    position in body[offset:] выполняется за O(1).
+    """
+
+    __slots__ = ('counts', 'prefixes')
+
+    def __init__(self, offsets=()):
+        """Инициализация пустого индекса с набором смещений"""
+        self.counts = Counter()
+        self.prefixes = {offset: Counter() for offset in offsets}
+
+    def push_head(self, position, cells):
+        """Учет новой головы. cells - очередь уже с новой головой."""
+        self.counts[position] += 1
+        size = len(cells)
+        for offset, prefix in self.prefixes.items():
+            prefix[position] += 1
+            if size > offset:
+                discard_one(prefix, cells[offset])
+
+    def pop_tail(self, position, size):
+        """Учет удаленного хвоста. size - длина тела до удаления."""
+        discard_one(self.counts, position)
+        for offset, prefix in self.prefixes.items():
+            if size <= offset:
+                discard_one(prefix, position)
+
+    def clear(self):
+        """Очистка индекса"""
+        self.counts.clear()
+        for prefix in self.prefixes.values():
+            prefix.clear()
+
+    def contains(self, position, start=0):
+        """Есть ли позиция в теле, начиная с индекса start"""
+        if not start:
+            return position in self.counts
+        return self.counts[position] > self.prefixes[start][position]
+
+
+class SnakeBody:
+    """Тело змеи: позиции от головы к хвосту.
+    Внутри лежит deque, поэтому добавление головы и удаление хвоста
+    выполняются за O(1) при любой длине змеи. Индекс занятости
+    обновляется вместе с телом.
+    """
+
+    __slots__ = ('cells', 'index', 'watchers')
+
+    def __init__(self, positions=(), offsets=()):
+        """Инициализация тела змеи начальными позициями.
+        offsets - смещения от головы, для которых нужна быстрая
+        проверка вхождения (см. contains).
+        """
+        self.cells = deque()
+        self.index = OccupancyIndex(offsets)
+        self.watchers = []
+        for position in reversed(tuple(positions)):
+            self.push_head(position)
+
+    def __len__(self):
+        """Количество позиций в теле"""
+        return len(self.cells)
+
+    def __iter__(self):
+        """Обход позиций от головы к хвосту"""
+        return iter(self.cells)
+
+    def __contains__(self, position):
+        """Проверка, занята ли позиция телом змеи"""
+        return self.index.contains(position)
+
+    def __getitem__(self, index):
+        """Доступ к позиции по индексу и срезы со смещением,
+        например body[GRID_SIZE * 3:]
+        """
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self.cells))
+            if step < 0:
+                return list(self.cells)[index]
+            return list(islice(self.cells, start, stop, step))
+        return self.cells[index]
+
+    def head(self):
+        """Позиция головы"""
+        return self.cells[0]
+
+    def push_head(self, position):
+        """Добавление новой позиции головы"""
+        self.cells.appendleft(position)
+        self.index.push_head(position, self.cells)
+        for watcher, owner in self.watchers:
+            watcher.add(position, owner)
+
+    def pop_tail(self):
+        """Удаление и возврат последней позиции хвоста"""
+        size = len(self.cells)
+        position = self.cells.pop()
+        self.index.pop_tail(position, size)
+        for watcher, owner in self.watchers:
+            watcher.remove(position, owner)
+        return position
+
+    def reset(self, position):
+        """Сброс тела до одной позиции"""
+        for watcher, owner in self.watchers:
+            for old_position in self.cells:
+                watcher.remove(old_position, owner)
+        self.cells.clear()
+        self.index.clear()
+        self.push_head(position)
+
+    def attach(self, watcher, owner):
+        """Подписка внешнего индекса (например, SpatialHash) на изменения
+        тела. watcher получает add/remove для каждой позиции.
+        """
+        for position in self.cells:
+            watcher.add(position, owner)
+        self.watchers.append((watcher, owner))
+
+    def contains(self, position, start=0):
+        """Проверка position in body[start:] без копирования среза.
+        start должен быть 0 или одним из смещений, переданных в __init__.
+        """
+        return self.index.contains(position, start)
+
+
+class SpatialHash:
+    """Равномерная сетка для грубой фазы поиска столкновений.
+    Ячейка сетки -> объект -> мультимножество его позиций в ячейке.
+    Запрос с порогом threshold просматривает только соседние ячейки,
+    а точная проверка совпадает с Game.is_collision.
+    Ячейки нумеруются числами y * stride + x, где в строке есть запас
+    HASH_PADDING ячеек, поэтому порог - не больше HASH_PADDING ячеек.
+    """
+
+    __slots__ = (
+        'cell_size', 'width', 'stride', 'cells', 'reaches', 'spare_items',
+        'spare_positions'
+    )
+
+    def __init__(self, cell_size, width):
+        """Инициализация пустой сетки с размером ячейки cell_size
+        для поля шириной width пикселей
+        """
+        self.cell_size = cell_size
+        self.width = width
+        self.stride = -(-width // cell_size) + HASH_PADDING
+        self.cells = {}
+        """Порог -> сдвиги номеров соседних ячеек, до которых он
+        дотягивается (считаются один раз на порог)
+        """
+        self.reaches = {}
+        """Опустевшие словари ячеек и мультимножества позиций.
+        Голова, входящая в новую ячейку, берет их отсюда, поэтому
+        движение змей не создает новых словарей.
+        """
+        self.spare_items = []
+        self.spare_positions = []
+
+    def cell_of(self, position):
+        """Ячейка сетки, в которую попадает позиция"""
+        return (
+            position // self.width // self.cell_size * self.stride
+            + position % self.width // self.cell_size
+        )
+
+    def add(self, position, item):
+        """Добавление позиции объекта item"""
+        cell = self.cell_of(position)
+        items = self.cells.get(cell)
+        if items is None:
+            items = self.cells[cell] = (
+                self.spare_items.pop() if self.spare_items else {}
+            )
+        positions = items.get(item)
+        if positions is None:
+            positions = items[item] = (
+                self.spare_positions.pop() if self.spare_positions
+                else Counter()
+            )
+        positions[position] += 1
+
+    def remove(self, position, item):
+        """Удаление одной позиции объекта item"""
+        cell = self.cell_of(position)
+        items = self.cells[cell]
+        positions = items[item]
+        discard_one(positions, position)
+        if not positions:
+            del items[item]
+            self.spare_positions.append(positions)
+            if not items:
+                del self.cells[cell]
+                self.spare_items.append(items)
+
+    def move(self, old_position, new_position, item):
+        """Перемещение объекта из одной позиции в другую"""
+        self.remove(old_position, item)
+        self.add(new_position, item)
+
+    def offsets(self, threshold):
+        """Сдвиги номеров ячеек, до которых может дотянуться
+        порог threshold, в порядке обхода соседей
+        """
+        offsets = self.reaches.get(threshold)
+        if offsets is None:
+            reach = ceil(threshold / self.cell_size)
+            offsets = self.reaches[threshold] = tuple(
+                dy * self.stride + dx
+                for dx in range(-reach, reach + 1)
+                for dy in range(-reach, reach + 1)
+            )
+        return offsets
+
+    def any_close(self, position, positions, threshold):
+        """Есть ли среди positions позиция ближе threshold"""
+        width = self.width
+        x1, y1 = position % width, position // width
+        limit = threshold ** 2
+        for other in positions:
+            if (other % width - x1) ** 2 + (other // width - y1) ** 2 < limit:
+                return True
+        return False
+
+    def query(self, position, threshold):
+        """Множество объектов, у которых есть позиция
+        на расстоянии меньше threshold от position.
+        Если таких нет, возвращается общее пустое NOTHING_FOUND.
+        """
+        found = NOTHING_FOUND
+        cell = self.cell_of(position)
+        for offset in self.offsets(threshold):
+            items = self.cells.get(cell + offset)
+            if not items:
+                continue
+            for item, positions in items.items():
+                if item not in found and self.any_close(
+                    position, positions, threshold
+                ):
+                    if not found:
+                        found = set()
+                    found.add(item)
+        return found
+
+    def collides(self, position, threshold, item):
+        """Есть ли у объекта item позиция ближе threshold к position"""
+        cell = self.cell_of(position)
+        for offset in self.offsets(threshold):
+            items = self.cells.get(cell + offset)
+            positions = items and items.get(item)
+            if positions and self.any_close(position, positions, threshold):
+                return True
+        return False
+
+
+class Board:
+    """Поле-тор width x height клеток со стороной cell_size пикселей.
+    Края поля склеены: змея, ушедшая за край, появляется с другой
+    стороны. Размер поля не связан с размером окна (см. Camera).
+    """
+
+    __slots__ = (
+        'width', 'height', 'cell_size', 'pixel_width', 'pixel_height',
+        'center'
+    )
+
+    def __init__(self, width, height, cell_size):
+        """Размеры поля в клетках и размер клетки в пикселях"""
+        self.width = width
+        self.height = height
+        self.cell_size = cell_size
+        self.pixel_width = width * cell_size
+        self.pixel_height = height * cell_size
+        self.center = self.pack(
+            width // 2 * cell_size, height // 2 * cell_size
+        )
+
+    def __len__(self):
+        """Количество клеток поля"""
+        return self.width * self.height
+
+    def pack(self, x, y):
+        """Позиция пикселя (x, y) одним числом"""
+        return y * self.pixel_width + x
+
+    def unpack(self, position):
+        """Координаты (x, y) упакованной позиции - для отрисовки"""
+        return position % self.pixel_width, position // self.pixel_width
+
+    def is_close(self, position1, position2, threshold):
+        """Ближе ли позиции threshold пикселей друг к другу
+        (без перехода через край, как и SpatialHash)
+        """
+        width = self.pixel_width
+        dx = position2 % width - position1 % width
+        dy = position2 // width - position1 // width
+        return dx * dx + dy * dy < threshold * threshold
+
+    def step_between(self, start, end):
+        """Смещение от точки start к близкой точке end (пары координат,
+        в том числе дробные при отрисовке) с учетом перехода через край
+        """
+        dx, dy = end[0] - start[0], end[1] - start[1]
+        if abs(dx) > self.pixel_width // 2:
+            dx -= self.pixel_width if dx > 0 else -self.pixel_width
+        if abs(dy) > self.pixel_height // 2:
+            dy -= self.pixel_height if dy > 0 else -self.pixel_height
+        return dx, dy
+
+    def free_cells(self):
+        """Индекс свободных клеток этого поля"""
+        return FreeCells(self.width, self.height, self.cell_size)
+
+
+class FreeCells:
+    """Свободные клетки поля для случайной расстановки объектов.
+    Клетки - номера y * width + x, выложенные в перестановку:
+    первые free номеров свободны. Занятие клетки меняет ее местами
+    с последней свободной, освобождение - с первой занятой, поэтому
+    все операции и выбор случайной клетки работают за O(1).
+    Перестановка хранится разреженно (только клетки не на своих
+    местах), и память не зависит от размера поля.
+    Клетка занята, пока в нее попадает хотя бы одна позиция объекта.
+    """
+
+    __slots__ = (
+        'width', 'cell_size', 'pixel_width', 'free', 'order', 'slots',
+        'taken'
+    )
+
+    def __init__(self, width, height, cell_size):
+        """Все клетки поля width x height изначально свободны"""
+        self.width = width
+        self.cell_size = cell_size
+        self.pixel_width = width * cell_size
+        self.free = width * height
+        """Клетка на месте slot и место клетки, если они отличаются"""
+        self.order = {}
+        self.slots = {}
+        self.taken = Counter()
+
+    def __len__(self):
+        """Количество свободных клеток"""
+        return self.free
+
+    def __contains__(self, position):
+        """Свободна ли клетка, в которую попадает позиция"""
+        return self.slot_of(self.index_of(position)) < self.free
+
+    def index_of(self, position):
+        """Номер клетки, в которую попадает позиция"""
+        return (
+            position // self.pixel_width // self.cell_size * self.width
+            + position % self.pixel_width // self.cell_size
+        )
+
+    def slot_of(self, index):
+        """Место клетки в перестановке"""
+        return self.slots.get(index, index)
+
+    def swap(self, slot, other):
+        """Обмен клеток на местах slot и other"""
+        index = self.order.get(slot, slot)
+        other_index = self.order.get(other, other)
+        for place, cell in ((slot, other_index), (other, index)):
+            if place == cell:
+                self.order.pop(place, None)
+                self.slots.pop(cell, None)
+            else:
+                self.order[place] = cell
+                self.slots[cell] = place
+
+    def add(self, position, owner=None):
+        """Позиция объекта занимает свою клетку"""
+        index = self.index_of(position)
+        self.taken[index] += 1
+        if self.taken[index] == 1:
+            self.free -= 1
+            self.swap(self.slot_of(index), self.free)
+
+    def remove(self, position, owner=None):
+        """Позиция объекта освобождает свою клетку"""
+        index = self.index_of(position)
+        discard_one(self.taken, index)
+        if index not in self.taken:
+            self.swap(self.slot_of(index), self.free)
+            self.free += 1
+
+    def move(self, old_position, new_position, owner=None):
+        """Перемещение объекта из одной клетки в другую"""
+        self.add(new_position, owner)
+        self.remove(old_position, owner)
+
+    def random_cell(self, rng=random):
+        """Случайная свободная клетка с равной вероятностью.
+        Если свободных клеток нет - BoardFullError.
+        """
+        if not self.free:
+            raise BoardFullError('На поле не осталось свободных клеток')
+        slot = rng.randrange(self.free)
+        index = self.order.get(slot, slot)
+        return (
+            index // self.width * self.cell_size * self.pixel_width
+            + index % self.width * self.cell_size
+        )
+
+
+class Scheduler:
+    """Таймеры по тактам игры в очереди с приоритетом (куче).
+    Таймер - разовый (at) или периодический (every), его обработчик
+    вызывается без аргументов. Проход run на такте трогает только
+    наступившие таймеры, а не опрашивает все условия каждый такт.
+    """
+
+    def __init__(self):
+        """Пустая очередь таймеров"""
+        self.queue = []
+        self.count = 0
+
+    def __len__(self):
+        """Количество таймеров в очереди (с отмененными)"""
+        return len(self.queue)
+
+    @staticmethod
+    def next_tick(period, after):
+        """Первый такт, кратный period, позже такта after"""
+        return after // period * period + period
+
+    def at(self, tick, callback, period=None):
+        """Таймер на такт tick. Возвращает таймер для cancel."""
+        timer = [tick, self.count, callback, period]
+        self.count += 1
+        heappush(self.queue, timer)
+        return timer
+
+    def every(self, period, callback, after=0):
+        """Таймер на каждый такт, кратный period, позже такта after.
+        Как и проверка timer % period < step_ticks, он срабатывает
+        на первом такте игры, дошедшем до очередного кратного.
+        """
+        return self.at(self.next_tick(period, after), callback, period)
+
+    @staticmethod
+    def cancel(timer):
+        """Отмена таймера: он будет пропущен и удален из очереди"""
+        if timer is not None:
+            timer[2] = None
+
+    def run(self, tick):
+        """Обработчики таймеров, наступивших к такту tick, по порядку
+        тактов и постановки. Периодический таймер ставится заново
+        до вызова обработчика, поэтому обработчик может его отменить.
+        """
+        queue = self.queue
+        while queue and queue[0][0] <= tick:
+            timer = heappop(queue)
+            callback, period = timer[2], timer[3]
+            if callback is None:
+                continue
+            if period:
+                timer[0] = self.next_tick(period, tick)
+                timer[1] = self.count
+                self.count += 1
+                heappush(queue, timer)
+            callback()
@@ -0,0 +1,56 @@
+import random
+
+import numpy as np
+import pytest
+
+import the_snake
+from batch_sim import ACTION_KEYS, BatchGame, DIRECTIONS
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_batch_game_moves_like_snake(seed):
+    rng = random.Random(seed)
+    snake = the_snake.Snake()
+    snake.length = the_snake.GRID_SIZE * 6
+    batch = BatchGame(1, seed=seed, snack_powers=())
+    batch.lengths[:] = snake.length
+    batch.directions[:] = [
+        tuple(direction) for direction in DIRECTIONS
+    ].index(snake.direction)
+    for _ in range(3000):
+        action = rng.randrange(5) if rng.random() < 0.05 else 0
+        if action:
+            snake.update_direction(
+                the_snake.TURNS.get((snake.direction, ACTION_KEYS[action]))
+            )
+        snake.move()
+        _, done = batch.step(np.array([action]))
+        if snake.positions.contains(
+            snake.get_head_position(), the_snake.GRID_SIZE * 3
+        ):
+            assert done[0], 'Пакетный симулятор пропустил самоукус.'
+            return
+        head = snake.board.unpack(snake.get_head_position())
+        assert tuple(batch.heads[0]) == head, (
+            'Голова в пакетном симуляторе должна двигаться '
+            'по правилам `Snake.get_new_head_position`.'
+        )
+        assert batch.body_lengths[0] == len(snake.positions)
+
+
+@pytest.mark.parametrize('power', (-3, -1, 0, 1, 3))
+def test_batch_game_eats_like_snake(power):
+    snake = the_snake.Snake()
+    batch = BatchGame(1, seed=0, snack_powers=(power,))
+    batch.lengths[:] = snake.length = the_snake.GRID_SIZE * 5
+    batch.speeds[:] = snake.speed = the_snake.EASY_START_SPEED + 40
+    batch.snacks[0, 0] = batch.heads[0]
+    batch.eat_snacks()
+    snake.length_affect(power)
+    snake.speed_affect(power)
+    assert batch.lengths[0] == snake.length, (
+        'Длина после яблока должна меняться как в `Snake.length_affect`.'
+    )
+    assert batch.speeds[0] == snake.speed, (
+        'Скорость после яблока должна меняться как в `Snake.speed_affect`.'
+    )
@@ -0,0 +1,50 @@
+from benchmarks.hot_paths import baseline_scale, compare, make_game
+from settings import CELL_MOVEMENT, GRID_SIZE
+
+
+def test_benchmark_game_has_requested_sizes():
+    game = make_game(length=300, bots=8, snacks=32)
+    assert len(game.snake.positions) == 300 * GRID_SIZE
+    assert (len(game.bots), len(game.snacks)) == (8, 32)
+    assert not game.snake.positions.contains(
+        game.snake.get_head_position(), GRID_SIZE * 3
+    ), 'Змея в бенчмарках не должна кусать себя.'
+
+
+def test_compare_reports_regressions_over_tolerance():
+    lines, regressions = compare(
+        {'a': 1.2, 'b': 1.3, 'c': 5.0}, {'a': 1.0, 'b': 1.0}, tolerance=0.25
+    )
+    assert regressions == ['b'], (
+        'Регрессией считается замедление больше допуска.'
+    )
+    assert len(lines) == 3
+
+
+def test_benchmark_cell_game_has_requested_sizes():
+    game = make_game(length=300, movement=CELL_MOVEMENT)
+    assert len(game.snake.positions) == 301
+    for _ in range(50):
+        game.snake.move()
+    assert len(game.snake.positions) == 301, (
+        'Клеточная змея должна хранить по клетке на каждую клетку длины.'
+    )
+    assert game.snake.length == 300 * GRID_SIZE
+
+
+def test_compare_corrects_for_machine_speed():
+    report = {'python': '3.12.1', 'machine': 'arm64', 'reference': 200.0}
+    baseline = {'python': '3.11.7', 'machine': 'x86_64', 'reference': 100.0}
+    scale, _ = baseline_scale(report, baseline)
+    _, regressions = compare(
+        {'a': 2.0, 'b': 3.0}, {'a': 1.0, 'b': 1.0}, scale=scale
+    )
+    assert regressions == ['b'], (
+        'Замедление всей машины не должно считаться регрессией.'
+    )
+    del baseline['reference']
+    scale, warning = baseline_scale(report, baseline)
+    assert scale is None and warning, (
+        'Базу из другого окружения без эталона сравнивать нельзя.'
+    )
+    assert baseline_scale(baseline, dict(baseline))[0] == 1.0
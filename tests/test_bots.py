@@ -0,0 +1,67 @@
+from bots import BotColumns, TurnSchedule
+
+
+def turning_ticks(turns, ticks, step_ticks=1):
+    due = {}
+    for timer in range(step_ticks, ticks + 1, step_ticks):
+        for index in turns.turning(timer):
+            due.setdefault(index, []).append(timer)
+    return due
+
+
+def test_turning_picks_bots_by_period():
+    turns = TurnSchedule()
+    for period in (140, 200, None, 140):
+        turns.add(period)
+    due = turning_ticks(turns, 420)
+    assert due[0] == due[3] == [140, 280, 420], (
+        'О повороте спрашиваются боты, чей период кратен такту.'
+    )
+    assert due[1] == [200, 400]
+    assert len(due[2]) == 420, 'Бот без периода спрашивается каждый такт.'
+    turns.set_period(2, 200, after=420)
+    assert turns.turning(421) == []
+    for timer in range(422, 601):
+        due = turns.turning(timer)
+    assert due == [1, 2], (
+        'После `set_period` бот должен перейти в группу нового периода.'
+    )
+
+
+def test_turning_matches_modulo_check_with_long_steps():
+    turns = TurnSchedule()
+    turns.add(140)
+    due = turning_ticks(turns, 1000, step_ticks=40)
+    assert due[0] == [
+        timer for timer in range(40, 1001, 40) if timer % 140 < 40
+    ], 'Таймер должен срабатывать на тех же тактах, что и проверка `%`.'
+
+
+def test_watched_period_rings_like_modulo_check():
+    turns = TurnSchedule()
+    turns.add(40)
+    turns.watch(200)
+    rang = []
+    for timer in range(40, 1001, 40):
+        turns.turning(timer)
+        if turns.rang(200):
+            rang.append(timer)
+    assert rang == [
+        timer for timer in range(40, 1001, 40) if timer % 200 < 40
+    ], 'Таймер `watch` должен срабатывать на тех же тактах, что и `%`.'
+
+
+def test_next_heads_turns_and_wraps():
+    columns = BotColumns()
+    columns.add(0)
+    columns.add(10)
+    columns.directions[:] = [(-1, 0), (1, 0)]
+    columns.next_directions[1] = (0, -1)
+    heads = columns.next_heads([0, 1], 100, 80, 1, 5, 10)
+    assert heads == [99, 65 * 100 + 10], (
+        'Прямой ход и поворот должны идти по правилам '
+        '`Snake.get_new_head_position`.'
+    )
+    assert columns.heads == heads
+    assert columns.directions[1] == (0, -1)
+    assert columns.next_directions[1] is None
@@ -0,0 +1,39 @@
+import pytest
+
+from events import Event, EventBus
+from settings import GAME_OVER, QUIT, SNACK_EATEN
+
+
+class Subscriber:
+    def __init__(self, log, name, kinds=None):
+        self.log, self.name, self.kinds = log, name, kinds
+
+    def notify(self, game, events):
+        self.log.append((self.name, list(events)))
+
+
+def test_bus_delivers_only_subscribed_kinds_once_per_tick():
+    log = []
+    bus = EventBus()
+    bus.subscribe(Subscriber(log, 'results', (GAME_OVER, QUIT)))
+    bus.subscribe(Subscriber(log, 'stats'))
+    bus.subscribe(Subscriber(log, 'audio', (SNACK_EATEN,)))
+    bus.publish(None, [])
+    assert log == [('stats', [])], (
+        'На пустом такте вызываются только подписчики на все события.'
+    )
+    log.clear()
+    events = [
+        Event(SNACK_EATEN, 1), Event(GAME_OVER, 2), Event(SNACK_EATEN, 3)
+    ]
+    bus.publish(None, events)
+    assert log == [
+        ('results', [events[1]]),
+        ('stats', events),
+        ('audio', [events[0], events[2]]),
+    ], 'Подписчик получает свои события одной пачкой в порядке подписки.'
+
+
+def test_bus_rejects_unknown_event_kinds():
+    with pytest.raises(ValueError):
+        EventBus().subscribe(Subscriber([], 'typo', ('game_ovr',)))
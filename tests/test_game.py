@@ -0,0 +1,259 @@
+import subprocess
+import sys
+import tracemalloc
+
+import pytest
+
+from bot_policies import path_planner, random_turns, snack_chaser
+from conftest import BASE_DIR
+from structures import Board
+import the_snake
+
+
+def test_game_step_runs_headless():
+    code = (
+        'import the_snake\n'
+        'game = the_snake.Game()\n'
+        'keys = (the_snake.K_UP, the_snake.K_LEFT)\n'
+        'for tick in range(5000):\n'
+        '    game.step([keys[tick // 100 % 2]] if not tick % 100 else [])\n'
+        'assert game.timer == 5000\n'
+        'assert not the_snake.pg.display.get_init()\n'
+    )
+    result = subprocess.run(
+        [sys.executable, '-c', code], cwd=BASE_DIR,
+        capture_output=True, text=True
+    )
+    assert result.returncode == 0, (
+        'Метод `Game.step` не должен открывать окно и обращаться '
+        f'к экрану:\n{result.stderr}'
+    )
+
+
+def test_game_step_notifies_observers():
+    notified = []
+
+    class Observer:
+        def notify(self, game, events):
+            notified.append(events)
+
+    game = the_snake.Game()
+    game.bus.subscribe(Observer())
+    events = game.step([the_snake.K_3])
+    assert notified == [events], (
+        'Наблюдатели должны получать события каждого такта.'
+    )
+    assert (the_snake.SCREEN_REFRESH, None) in events
+
+
+def test_quit_key_is_an_event():
+    game = the_snake.Game()
+    assert (the_snake.QUIT, None) in game.step([the_snake.K_ESCAPE]), (
+        'Нажатие ESC в `Game.step` должно превращаться в событие выхода.'
+    )
+
+
+def test_games_with_same_seed_are_equal():
+    games = [the_snake.Game(seed=7), the_snake.Game(seed=7)]
+    for game in games:
+        for tick in range(3000):
+            game.step([the_snake.K_UP] if tick == 500 else [])
+    first, second = (
+        (
+            list(game.snake.positions),
+            [list(bot.positions) for bot in game.bots],
+            [snack.position for snack in game.snacks],
+        )
+        for game in games
+    )
+    assert first == second, (
+        'Игры с одинаковым зерном `seed` должны идти одинаково.'
+    )
+
+
+def test_cell_movement_steps_whole_cells():
+    game = the_snake.Game(seed=7, movement=the_snake.CELL_MOVEMENT)
+    snake = game.snake
+    snake.length = 5 * the_snake.GRID_SIZE
+    for _ in range(10):
+        head = snake.get_head_position()
+        game.step(())
+        if snake.get_head_position() == snake.position:
+            continue
+        dx, dy = game.board.step_between(
+            game.board.unpack(head),
+            game.board.unpack(snake.get_head_position())
+        )
+        assert abs(dx) + abs(dy) == the_snake.GRID_SIZE, (
+            'В клеточной модели голова за такт проходит одну клетку.'
+        )
+    assert game.timer == 10 * the_snake.GRID_SIZE
+    assert len(snake.positions) == 6
+
+
+def test_cell_movement_selfbite_ends_game():
+    game = the_snake.Game(seed=1, movement=the_snake.CELL_MOVEMENT)
+    game.hide_extras()
+    snake = game.snake
+    snake.length = 6 * the_snake.GRID_SIZE
+    snake.direction = the_snake.RIGHT
+    turns = (the_snake.K_DOWN, the_snake.K_LEFT, the_snake.K_UP)
+    events = []
+    for tick in range(12):
+        keys = [turns[tick - 6]] if 6 <= tick < 9 else []
+        events += game.step(keys)
+    assert any(kind == the_snake.GAME_OVER for kind, _ in events), (
+        'Клеточная змея должна кусать себя, войдя в клетку своего тела.'
+    )
+
+
+def test_cell_games_with_same_seed_are_equal():
+    games = [
+        the_snake.Game(seed=9, movement=the_snake.CELL_MOVEMENT)
+        for _ in range(2)
+    ]
+    for game in games:
+        for tick in range(500):
+            game.step([the_snake.K_LEFT] if tick == 40 else [])
+    assert games[0].state_hash() == games[1].state_hash()
+
+
+def test_batched_bots_match_reference_bots():
+    board = Board(40, 30, the_snake.GRID_SIZE)
+    keys = (
+        the_snake.K_UP, the_snake.K_LEFT,
+        the_snake.K_DOWN, the_snake.K_RIGHT
+    )
+    for movement in the_snake.MOVEMENTS:
+        games = [
+            the_snake.Game(
+                seed=3, movement=movement, board=board, bot_count=30,
+                batched_bots=batched, bot_policies=[
+                    (random_turns, snack_chaser, path_planner)[index % 3]
+                    for index in range(30)
+                ]
+            )
+            for batched in (False, True)
+        ]
+        for game in games:
+            for tick in range(3000 // game.step_ticks):
+                game.step([keys[tick // 37 % 4]] if not tick % 37 else [])
+        assert games[0].state_hash() == games[1].state_hash(), (
+            'Пакетный проход по ботам должен приводить к тому же '
+            f'состоянию, что и отдельные боты (модель {movement}).'
+        )
+
+
+def test_set_bot_policy_reschedules_bot_turns():
+    board = Board(40, 30, the_snake.GRID_SIZE)
+    games = [
+        the_snake.Game(
+            seed=5, board=board, bot_count=12, batched_bots=batched
+        )
+        for batched in (False, True)
+    ]
+    for game in games:
+        for tick in range(1000):
+            if tick == 300:
+                for index in range(0, 12, 3):
+                    game.set_bot_policy(index, snack_chaser)
+            game.step()
+    for game in games:
+        assert game.bot_turns.periods[3] == the_snake.GRID_SIZE, (
+            '`set_bot_policy` должен менять период поворотов бота.'
+        )
+    assert games[0].state_hash() == games[1].state_hash(), (
+        'После смены стратегии боты в столбцах должны поворачивать '
+        'так же, как отдельные боты.'
+    )
+    with pytest.raises(TypeError):
+        games[0].bot_policies[0] = snack_chaser
+
+
+def test_missing_bot_policies_default_to_random_turns():
+    game = the_snake.Game(seed=4, bot_policies=[snack_chaser], bot_count=3)
+    assert game.bot_policies == (snack_chaser, random_turns, random_turns)
+    for _ in range(1000):
+        game.step()
+    with pytest.raises(ValueError):
+        the_snake.Game(bot_policies=[random_turns] * 3, bot_count=2)
+
+
+def test_bot_count_is_configurable():
+    game = the_snake.Game(
+        seed=1, board=Board(60, 60, the_snake.GRID_SIZE), bot_count=200
+    )
+    assert len(game.bots) == 200
+    assert len(game.bot_columns) == 200
+    for _ in range(100):
+        game.step()
+    assert game.bot_columns.heads == [
+        bot.get_head_position() for bot in game.bots
+    ], 'Столбец голов должен совпадать с головами ботов.'
+
+
+def test_snack_returns_after_full_board_frees_up():
+    game = the_snake.Game(
+        seed=1, board=Board(4, 4, the_snake.GRID_SIZE), bot_count=0
+    )
+    fillers = []
+    while len(game.free_cells):
+        fillers.append(game.free_cells.random_cell(game.rng))
+        game.free_cells.add(fillers[-1])
+    game.relocate_snack(game.apple)
+    assert not game.apple.is_active
+    game.timer += the_snake.SNACK_RETRY_PERIOD
+    game.scheduler.run(game.timer)
+    assert not game.apple.is_active, 'На заполненном поле яблоку нет места.'
+    game.free_cells.remove(fillers[0])
+    game.timer += the_snake.SNACK_RETRY_PERIOD
+    game.scheduler.run(game.timer)
+    assert game.apple.is_active, (
+        'Яблоко должно вернуться, когда на поле освободится клетка.'
+    )
+    assert game.apple.position == fillers[0]
+
+
+def test_captured_bot_revives_on_timer():
+    game = the_snake.Game(seed=2)
+    bot = game.bots[0]
+    game.timer = 1500
+    for position in (bot.get_head_position(), *[0] * 50):
+        game.snake.positions.push_head(position)
+    game.handle_bot_capture(bot)
+    assert game.captured_bot is bot and not bot.is_active
+    game.scheduler.run(1999)
+    assert not bot.is_active
+    game.scheduler.run(the_snake.BOT_REVIVAL_PERIOD)
+    assert bot.is_active and game.captured_bot is None, (
+        'Захваченный бот должен вернуться на такте, кратном '
+        '`BOT_REVIVAL_PERIOD`.'
+    )
+
+
+def test_game_objects_have_no_instance_dict():
+    for movement in the_snake.MOVEMENTS:
+        game = the_snake.Game(movement=movement)
+        for item in (game.snake, game.apple, *game.snacks, *game.bots):
+            assert not hasattr(item, '__dict__'), (
+                f'У {type(item).__name__} атрибуты должны быть в __slots__.'
+            )
+
+
+@pytest.mark.parametrize('movement', the_snake.MOVEMENTS)
+def test_game_step_allocates_almost_nothing_in_steady_state(movement):
+    game = the_snake.Game(seed=1, movement=movement)
+    for _ in range(300):
+        game.step(())
+    peaks = []
+    tracemalloc.start()
+    for _ in range(300):
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        game.step(())
+        peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    tracemalloc.stop()
+    assert sorted(peaks)[len(peaks) // 2] < 512, (
+        'Обычный такт не должен создавать списков, множеств и словарей: '
+        'остаются только числа новых голов и промежуточных вычислений.'
+    )
@@ -17,3 +17,41 @@ def test_main_run_without_exceptions():
             f'`{type(error).__name__}: {error}`\n\n'
             'Убедитесь, что функция работает корректно.'
         )
+
+
+@pytest.mark.timeout(1, method='thread')
+def test_main_runs_fixed_logic_steps_per_frame(monkeypatch):
+    frame_times = iter((16, 16, 7, 1000, 3))
+
+    class Clock:
+        @staticmethod
+        def tick(fps):
+            milliseconds = next(frame_times, None)
+            if milliseconds is None:
+                raise StopInfiniteLoop
+            return milliseconds
+
+    steps = []
+    frames = []
+    monkeypatch.setattr(the_snake, 'clock', Clock)
+    monkeypatch.setattr(
+        the_snake.Game, 'step', lambda game, keys: steps.append(game)
+    )
+    monkeypatch.setattr(
+        the_snake.Renderer, 'render',
+        lambda renderer, game, alpha: frames.append((len(steps), alpha))
+    )
+    with pytest.raises(StopInfiniteLoop):
+        the_snake.main()
+    capped = 7 + the_snake.MAX_STEPS_PER_FRAME
+    assert [count for count, _ in frames] == [3, 6, 7, capped, capped], (
+        'За кадр должно выполняться столько тактов длиной '
+        '`step_ticks / speed`, сколько их уложилось во время кадра, '
+        'но не больше `MAX_STEPS_PER_FRAME`.'
+    )
+    assert [alpha for _, alpha in frames] == pytest.approx(
+        [0.2, 0.4, 0.8, 0, 0.6]
+    ), (
+        'Остаток времени кадра должен переходить в следующий кадр, '
+        'а после упора в `MAX_STEPS_PER_FRAME` - сбрасываться.'
+    )
@@ -0,0 +1,46 @@
+from planner import Planner
+from settings import GRID_SIZE, DOWN, LEFT, RIGHT, UP
+from structures import Board
+
+
+def test_distance_field_wraps_around_board():
+    board = Board(7, 5, GRID_SIZE)
+    planner = Planner(board)
+    field = planner.distance_field(0)
+    for cell in range(len(board)):
+        x, y = cell % 7, cell // 7
+        assert field[cell] == min(x, 7 - x) + min(y, 5 - y), (
+            'Поле расстояний должно учитывать переход через края поля.'
+        )
+
+
+def test_distance_field_is_limited_by_radius():
+    planner = Planner(Board(500, 500, GRID_SIZE), radius=3)
+    field = planner.distance_field(250 * 500 + 250)
+    assert len(field) == 1 + 4 + 8 + 12
+    assert max(field.values()) == 3
+
+
+def test_direction_follows_field_and_caches_it():
+    board = Board(20, 20, GRID_SIZE)
+    planner = Planner(board)
+    snack = board.pack(5 * GRID_SIZE, 2 * GRID_SIZE)
+    start = board.pack(2 * GRID_SIZE, 2 * GRID_SIZE)
+    turn = planner.direction(start, UP, [snack])
+    assert turn == RIGHT, 'Бот должен поворачивать к яблоку.'
+    start = board.pack(5 * GRID_SIZE, 0)
+    assert planner.direction(start, DOWN, [snack]) == DOWN, (
+        'На кратчайшем пути бот должен ехать прямо.'
+    )
+    assert (planner.hits, planner.misses) == (1, 1), (
+        'Поле яблока должно считаться один раз на все запросы.'
+    )
+    moved = board.pack(15 * GRID_SIZE, 2 * GRID_SIZE)
+    start = board.pack(18 * GRID_SIZE, 2 * GRID_SIZE)
+    turn = planner.direction(start, UP, [moved])
+    assert turn == LEFT
+    assert list(planner.fields) == [2 * 20 + 15], (
+        'Поле переместившегося яблока должно уходить из кэша.'
+    )
+    far = Planner(Board(100, 100, GRID_SIZE), radius=5)
+    assert far.direction(0, UP, [50 * GRID_SIZE]) is None
@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+import the_snake
+from profiler import NO_PHASE, Profiler
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = Profiler()
+    assert profiler.phase('move') is NO_PHASE, (
+        'Выключенный профайлер должен отдавать общий пустой контекст.'
+    )
+    with profiler.phase('move'):
+        pass
+    assert not profiler.samples and not profiler.trace
+
+
+def test_profiler_percentiles_and_trace_export(tmp_path):
+    now = [0.0]
+    profiler = Profiler(window=100, clock=lambda: now[0])
+    profiler.enabled = True
+    for duration in range(1, 101):
+        with profiler.phase('move'):
+            now[0] += duration / 1000
+    assert profiler.percentiles('move') == pytest.approx((0.051, 0.1)), (
+        'p50 и p99 должны считаться по последним замерам фазы.'
+    )
+    path = tmp_path / 'trace.json'
+    profiler.export_trace(path)
+    events = json.loads(path.read_text())['traceEvents']
+    assert len(events) == 100
+    assert events[-1]['ph'] == 'X'
+    assert events[-1]['dur'] == pytest.approx(100000)
+
+
+def test_game_step_phases_are_profiled(monkeypatch):
+    profiler = Profiler()
+    profiler.enabled = True
+    monkeypatch.setattr(the_snake, 'profiler', profiler)
+    game = the_snake.Game(seed=1)
+    events = game.step([the_snake.K_5])
+    assert (the_snake.PROFILER_TOGGLE, None) in events
+    assert {'keys', 'move', 'collisions', 'observers'} <= set(
+        profiler.samples
+    ), 'Такт игры должен замерять свои фазы.'
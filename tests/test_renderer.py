@@ -0,0 +1,204 @@
+import random
+
+import the_snake
+
+
+def test_text_cache_counts_hits_and_evicts_oldest():
+    cache = the_snake.TextCache(the_snake.GAME_FONT, max_size=2)
+    first = cache.render('+1', the_snake.TEXT_COLOR)
+    assert cache.render('+1', the_snake.TEXT_COLOR) is first, (
+        'Повторная надпись должна браться из кэша.'
+    )
+    cache.render('+2', the_snake.TEXT_COLOR)
+    cache.render('+3', the_snake.TEXT_COLOR)
+    assert (cache.hits, cache.misses) == (1, 3)
+    assert len(cache.surfaces) == 2, (
+        'Кэш надписей не должен превышать `max_size`.'
+    )
+    cache.render('+1', the_snake.TEXT_COLOR)
+    assert cache.misses == 4, (
+        'Самая старая надпись должна вытесняться из кэша первой.'
+    )
+
+
+def test_hud_model_publishes_only_changes_and_throttles():
+    now = [0.0]
+    hud = the_snake.HudModel(min_interval=0.1, clock=lambda: now[0])
+    calls = []
+    hud.subscribe(lambda values: calls.append(dict(values)), ('length',))
+    assert hud.update(length=1, speed=5)
+    assert not hud.update(length=1, speed=5), (
+        'Без изменений подписчики не должны оповещаться.'
+    )
+    now[0] = 0.05
+    assert not hud.update(length=2), (
+        'Изменения чаще `min_interval` должны откладываться.'
+    )
+    now[0] = 0.2
+    assert hud.update(), 'Отложенные изменения должны публиковаться позже.'
+    assert [call['length'] for call in calls] == [1, 2]
+    now[0] = 0.4
+    hud.update(speed=6)
+    assert len(calls) == 2, (
+        'Подписчик не должен вызываться при изменении чужих ключей.'
+    )
+
+
+def test_camera_follows_snake_and_culls_on_large_board():
+    board = the_snake.Board(100, 100, the_snake.GRID_SIZE)
+    camera = the_snake.Camera(board)
+    head = (50 * the_snake.GRID_SIZE, 50 * the_snake.GRID_SIZE)
+    assert not camera.visible(head), (
+        'Объекты вне окна не должны рисоваться.'
+    )
+    assert camera.follow(head)
+    x, y = camera.to_view(head)
+    assert (x, y) == (
+        the_snake.SCREEN_WIDTH // 2, the_snake.SCREEN_HEIGHT // 2
+    ), 'Сдвинувшись, камера должна центрироваться на голове змеи.'
+    assert not camera.follow((head[0] + the_snake.GRID_SIZE, head[1])), (
+        'Вдали от краев окна камера не должна сдвигаться.'
+    )
+    fixed = the_snake.Camera(the_snake.DEFAULT_BOARD)
+    assert fixed.to_view(head) == head and not fixed.follow(head), (
+        'Если поле размером с окно, камера не двигается.'
+    )
+
+
+def test_cell_snake_incremental_frames_match_full_repaint():
+    rng = random.Random(1)
+    game = the_snake.Game(seed=3, movement=the_snake.CELL_MOVEMENT)
+    renderer = the_snake.Renderer()
+    game.bus.subscribe(renderer)
+    renderer.screen_refresh()
+    game.hide_extras()
+    snake = game.snake
+    snake.length = 8 * the_snake.GRID_SIZE
+    keys = (
+        the_snake.K_UP, the_snake.K_LEFT,
+        the_snake.K_DOWN, the_snake.K_RIGHT
+    )
+    surface = the_snake.surface
+    lag = 0
+    for frame in range(400):
+        lag += rng.choice((16, 17)) / 1000
+        actions = [rng.choice(keys)] if rng.random() < 0.03 else []
+        while lag >= game.step_ticks / snake.speed:
+            lag -= game.step_ticks / snake.speed
+            game.step(actions)
+            actions = []
+        alpha = lag * snake.speed / game.step_ticks
+        renderer.render(game, alpha)
+        incremental = surface.copy()
+        drawn, popped = snake.drawn, list(snake.popped)
+        surface.fill(the_snake.BOARD_BACKGROUND_COLOR)
+        for snack in game.snacks:
+            if snack.is_active:
+                snack.draw()
+        snake.repaint()
+        snake.draw(alpha)
+        full = the_snake.pg.image.tobytes(surface, 'RGBA')
+        surface.blit(incremental, (0, 0))
+        snake.drawn = drawn
+        snake.popped.extend(popped)
+        assert the_snake.pg.image.tobytes(incremental, 'RGBA') == full, (
+            f'Кадр {frame}: дорисовка концов клеточной змеи должна давать '
+            'ту же картинку, что и полная перерисовка.'
+        )
+
+
+def test_profile_table_reuses_cached_labels(monkeypatch):
+    profiler = the_snake.Profiler()
+    profiler.add('move', 0, 0.001)
+    monkeypatch.setattr(the_snake, 'profiler', profiler)
+    renderer = the_snake.Renderer()
+    renderer.update_profile()
+    cache = renderer.profile_text
+    misses = cache.misses
+    renderer.profile_at = 0
+    renderer.update_profile()
+    assert cache.misses == misses, (
+        'Повторная таблица замеров должна брать надписи из кэша.'
+    )
+
+
+def test_renderer_reports_loop_stats_on_quit(monkeypatch, capsys):
+    stats = the_snake.LoopStats()
+    stats.add_frame(0.002)
+    monkeypatch.setattr(the_snake, 'loop_stats', stats)
+    quits = []
+    monkeypatch.setattr(
+        the_snake.Game, 'handle_quit', staticmethod(lambda: quits.append(1))
+    )
+    game = the_snake.Game(seed=0)
+    game.bus.subscribe(the_snake.Renderer())
+    game.step([the_snake.K_ESCAPE])
+    assert quits == [1]
+    assert 'Кадров: 1' in capsys.readouterr().out, (
+        'Сводку цикла при выходе должна печатать отрисовка.'
+    )
+
+
+def test_dirty_rects_merge_nested_and_refresh_whole_frame():
+    dirty = the_snake.DirtyRects()
+    cell = the_snake.pg.Rect(0, 0, the_snake.GRID_SIZE, the_snake.GRID_SIZE)
+    dirty.add(cell)
+    assert dirty.take() == (True, []), (
+        'Первый кадр должен выводиться целиком, без отдельных областей.'
+    )
+    dirty.add(cell)
+    dirty.add(cell.inflate(-4, -4))
+    dirty.add(cell.move(100, 0))
+    dirty.add(cell.move(100, 0).inflate(4, 4))
+    assert dirty.take() == (
+        False, [cell, cell.move(100, 0).inflate(4, 4)]
+    ), (
+        'Область внутри предыдущей не должна добавляться, '
+        'а охватывающая предыдущую должна ее заменять.'
+    )
+    assert dirty.take() == (False, []), (
+        'После вывода кадра список областей должен очищаться.'
+    )
+    dirty.add(cell)
+    dirty.add_full()
+    dirty.add(cell)
+    assert dirty.take() == (True, []), (
+        'После перезаливки экрана кадр выводится целиком.'
+    )
+
+
+def test_screen_refresh_event_redraws_whole_frame():
+    game = the_snake.Game(seed=0)
+    renderer = the_snake.Renderer()
+    game.bus.subscribe(renderer)
+    renderer.render(game)
+    game.step([])
+    renderer.render(game)
+    full, _ = the_snake.dirty_rects.take()
+    assert not full, 'Без перезаливки кадр выводится по областям.'
+    game.step([the_snake.K_1])
+    full, _ = the_snake.dirty_rects.take()
+    assert full, 'После SCREEN_REFRESH кадр должен выводиться целиком.'
+
+
+def test_sprite_atlas_is_cached_per_grid_size(monkeypatch):
+    monkeypatch.setattr(the_snake, 'sprite_atlases', {})
+    atlas = the_snake.get_sprite_atlas()
+    assert the_snake.get_sprite_atlas() is atlas, (
+        'Атлас для одного размера клетки должен строиться один раз.'
+    )
+    assert atlas.grid_size == the_snake.GRID_SIZE
+    small = the_snake.get_sprite_atlas(20)
+    assert small is not atlas and small.grid_size == 20, (
+        'Для другого размера клетки должен строиться свой атлас.'
+    )
+    assert small.cell(the_snake.SNAKE_COLOR).get_size() == (20, 20)
+    assert the_snake.get_sprite_atlas(20) is small
+    apple = the_snake.Apple(board=the_snake.Board(10, 10, 20))
+    apple.is_active = False
+    the_snake.dirty_rects.take()
+    apple.draw()
+    _, rects = the_snake.dirty_rects.take()
+    assert [rect.size for rect in rects] == [(20, 20)], (
+        'Объект должен рисоваться атласом для клетки своего поля.'
+    )
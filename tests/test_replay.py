@@ -0,0 +1,74 @@
+import pytest
+
+import the_snake
+from recording import (
+    EVENT, HEADER, MAGIC, VERSION, Recorder, RecordingError
+)
+from replay import replay
+from structures import Board
+
+
+def record_game(path, seed, ticks, movement=the_snake.PIXEL_MOVEMENT):
+    game = the_snake.Game(seed=seed, movement=movement)
+    game.hide_extras()
+    game.bus.subscribe(Recorder(path, seed, movement))
+    keys = (
+        the_snake.K_UP, the_snake.K_LEFT, the_snake.K_3,
+        the_snake.K_DOWN, the_snake.K_4, the_snake.K_RIGHT
+    )
+    for tick in range(ticks):
+        game.step([keys[tick // 150 % len(keys)]] if not tick % 150 else [])
+    game.step([the_snake.K_ESCAPE])
+    return game
+
+
+@pytest.mark.parametrize(
+    'movement', (the_snake.PIXEL_MOVEMENT, the_snake.CELL_MOVEMENT)
+)
+def test_replay_reproduces_recorded_game(tmp_path, movement):
+    path = tmp_path / 'game.rec'
+    game = record_game(path, seed=11, ticks=3000, movement=movement)
+    replayed, matched = replay(path)
+    assert matched, 'Повтор записи должен приводить к тому же состоянию.'
+    assert replayed.state_hash() == game.state_hash()
+    assert replayed.movement == movement
+    assert list(replayed.snake.positions) == list(game.snake.positions)
+    size = HEADER.size + EVENT.size * 22 + 32
+    assert path.stat().st_size == size, (
+        'На каждое нажатие в записи должно уходить по 5 байт.'
+    )
+
+
+def test_replay_detects_divergence_and_truncation(tmp_path):
+    path = tmp_path / 'game.rec'
+    record_game(path, seed=3, ticks=1000)
+    data = bytearray(path.read_bytes())
+    seed_offset = len(MAGIC) + 1
+    data[seed_offset] ^= 1
+    path.write_bytes(data)
+    assert not replay(path)[1], (
+        'Повтор с другим зерном не должен совпадать с записью.'
+    )
+    path.write_bytes(data[:-10])
+    with pytest.raises(RecordingError):
+        replay(path)
+    data[len(MAGIC)] = VERSION + 1
+    path.write_bytes(data)
+    with pytest.raises(RecordingError):
+        replay(path)
+
+
+def test_replay_restores_bot_population(tmp_path):
+    path = tmp_path / 'game.rec'
+    board = Board(50, 40, the_snake.GRID_SIZE)
+    game = the_snake.Game(seed=5, board=board, bot_count=25)
+    game.hide_extras()
+    game.bus.subscribe(Recorder(path, 5, board=board, bot_count=25))
+    game.step([the_snake.K_4])
+    for _ in range(500):
+        game.step()
+    game.step([the_snake.K_ESCAPE])
+    replayed, matched = replay(path)
+    assert matched and len(replayed.bots) == 25, (
+        'Запись должна хранить количество ботов.'
+    )
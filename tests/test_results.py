@@ -0,0 +1,134 @@
+import atexit
+import sqlite3
+import threading
+
+import pytest
+
+import the_snake
+from events import Event
+from results import ResultsError, ResultsStore
+from settings import EASY, GAME_OVER, HARD, QUIT
+
+
+def test_results_store_writes_batches_and_builds_leaderboard(tmp_path):
+    path = tmp_path / 'results.sqlite3'
+    store = ResultsStore(path, batch_size=3, flush_interval=60)
+    store.add(5, 1, EASY, timestamp=1)
+    store.add(9, 2, HARD, captures=2, timestamp=2)
+    store.add(7, 1, EASY, timestamp=3)
+    store.add(4, 1, EASY, timestamp=4)
+    store.close()
+
+    store = ResultsStore(path)
+    assert [result.length for result in store.leaderboard(EASY)] == [7, 5, 4]
+    assert store.leaderboard(limit=1)[0].captures == 2
+    assert store.best_results() == {EASY: 7, HARD: 9}
+    store.close()
+
+
+def test_results_store_does_io_off_the_calling_thread(tmp_path, monkeypatch):
+    threads = []
+    original_connect = sqlite3.connect
+
+    def tracking_connect(*args, **kwargs):
+        threads.append(threading.current_thread())
+        return original_connect(*args, **kwargs)
+
+    monkeypatch.setattr(sqlite3, 'connect', tracking_connect)
+    store = ResultsStore(tmp_path / 'results.sqlite3', batch_size=1)
+    store.add(5, 1, EASY)
+    store.flush()
+    assert threads and threading.current_thread() not in threads, (
+        'Результаты должен записывать фоновый поток, а не игровой цикл.'
+    )
+    store.close()
+    assert not store.writer
+
+
+def test_best_result_persists_across_games(tmp_path):
+    store = ResultsStore(tmp_path / 'results.sqlite3')
+    game = the_snake.Game(results=store)
+    assert store in game.bus
+    game.bot_capture_amount = 1
+    game.bus.publish(game, [Event(GAME_OVER, (12, 3, EASY))])
+    game.bus.publish(game, [Event(QUIT, None)])
+    assert not store.writer, 'Хранилище должно закрываться по QUIT.'
+
+    game = the_snake.Game(results=ResultsStore(store.path))
+    assert game.snake.best_result[EASY] == 12, (
+        'Рекорд должен загружаться из хранилища результатов.'
+    )
+    assert game.results.leaderboard()[0].captures == 1
+    game.results.close()
+
+
+def test_writer_errors_reach_flush_and_close(tmp_path):
+    store = ResultsStore(tmp_path, batch_size=1)
+    store.add(5, 1, EASY)
+    with pytest.raises(ResultsError):
+        store.flush()
+    store.add(6, 1, EASY)
+    with pytest.raises(ResultsError):
+        store.close()
+    store.close()
+
+
+@pytest.mark.timeout(5, method='thread')
+def test_flush_does_not_wait_for_dead_writer(tmp_path, monkeypatch):
+    store = ResultsStore(
+        tmp_path / 'results.sqlite3', batch_size=1, flush_interval=0.1
+    )
+
+    def crash(connection, batch):
+        raise RuntimeError('writer crashed')
+
+    monkeypatch.setattr(store, 'write_batch', crash)
+    store.add(5, 1, EASY)
+    with pytest.raises(ResultsError, match='writer crashed'):
+        store.flush()
+    assert not store.writer.is_alive(), (
+        'Писатель, упавший с исключением, не должен подвешивать flush.'
+    )
+    store.close()
+
+
+def test_close_drops_exit_hook(tmp_path, monkeypatch):
+    hooks = []
+    monkeypatch.setattr(atexit, 'register', hooks.append)
+    monkeypatch.setattr(atexit, 'unregister', hooks.remove)
+    store = ResultsStore(tmp_path / 'results.sqlite3')
+    assert not hooks, 'Хранилище без писателя не держит хук выхода.'
+    store.add(5, 1, EASY)
+    store.add(6, 1, EASY)
+    assert hooks == [store.close]
+    store.close()
+    assert not hooks, (
+        'Закрытое хранилище не должно жить до выхода из программы.'
+    )
+
+
+def test_quit_reports_writer_error_to_later_subscribers(
+        tmp_path, monkeypatch, capsys
+):
+    store = ResultsStore(tmp_path / 'results.sqlite3', batch_size=1)
+    game = the_snake.Game(results=store)
+
+    def fail(connection, batch):
+        store.error = sqlite3.OperationalError('disk I/O error')
+
+    monkeypatch.setattr(store, 'write_batch', fail)
+    received = []
+
+    class Listener:
+        kinds = (QUIT,)
+
+        def notify(self, game, events):
+            received.extend(events)
+
+    game.bus.subscribe(Listener())
+    store.add(5, 1, EASY)
+    game.bus.publish(game, [Event(QUIT, None)])
+    assert received == [(QUIT, None)], (
+        'Ошибка записи не должна мешать другим подписчикам получить QUIT.'
+    )
+    assert 'результаты не записаны' in capsys.readouterr().err
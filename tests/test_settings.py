@@ -0,0 +1,38 @@
+import subprocess
+import sys
+
+import pygame
+
+import settings
+from conftest import BASE_DIR
+
+
+def test_key_codes_match_pygame():
+    for name in (
+        'K_UP', 'K_DOWN', 'K_LEFT', 'K_RIGHT',
+        'K_1', 'K_2', 'K_3', 'K_4', 'K_5', 'K_ESCAPE'
+    ):
+        assert getattr(settings, name) == getattr(pygame, name), (
+            f'Код клавиши `{name}` в settings должен совпадать с pygame.'
+        )
+
+
+def test_imports_do_not_need_display():
+    code = (
+        'import sys\n'
+        'sys.modules["pygame"] = None\n'
+        'import settings, structures, results, recording, bot_policies\n'
+        'del sys.modules["pygame"]\n'
+        'import pygame, the_snake\n'
+        'assert not pygame.display.get_init()\n'
+        'the_snake.Game(seed=1).step([settings.K_UP])\n'
+        'assert not pygame.display.get_init()\n'
+    )
+    result = subprocess.run(
+        [sys.executable, '-c', code], cwd=BASE_DIR,
+        capture_output=True, text=True
+    )
+    assert result.returncode == 0, (
+        'settings должен импортироваться без pygame, а импорт the_snake '
+        f'и безголовая игра - не открывать окно:\n{result.stderr}'
+    )
@@ -0,0 +1,185 @@
+import random
+import tracemalloc
+
+import pytest
+
+from structures import (
+    Board, BoardFullError, FreeCells, Scheduler, SnakeBody, SpatialHash
+)
+
+
+def test_snake_body_head_and_tail():
+    body = SnakeBody([(0, 0)])
+    for x in range(1, 6):
+        body.push_head((x, 0))
+    assert body.head() == (5, 0), (
+        'Метод `push_head` должен добавлять позицию в начало тела змеи.'
+    )
+    assert body.pop_tail() == (0, 0), (
+        'Метод `pop_tail` должен удалять и возвращать последнюю позицию.'
+    )
+    assert len(body) == 5
+
+
+def test_snake_body_slicing_matches_list():
+    positions = [(x, 0) for x in range(10)]
+    body = SnakeBody(positions)
+    for index in (slice(3, None), slice(0, 4), slice(None, None, 2),
+                  slice(-3, None), slice(None, None, -1)):
+        assert body[index] == positions[index], (
+            f'Срез `{index}` тела змеи должен совпадать со срезом списка.'
+        )
+    assert body[-1] == positions[-1]
+
+
+def test_snake_body_contains_matches_slice():
+    rng = random.Random(1)
+    offsets = (3, 7)
+    body = SnakeBody([(0, 0)], offsets=offsets)
+    reference = [(0, 0)]
+    for _ in range(2000):
+        if rng.random() < 0.6 or len(reference) == 1:
+            position = (rng.randint(0, 4), rng.randint(0, 4))
+            body.push_head(position)
+            reference.insert(0, position)
+        else:
+            assert body.pop_tail() == reference.pop()
+        for position in ((x, y) for x in range(5) for y in range(5)):
+            for offset in (0, *offsets):
+                assert body.contains(position, offset) == (
+                    position in reference[offset:]
+                ), (
+                    'Метод `contains` должен совпадать с проверкой '
+                    f'`position in positions[{offset}:]`.'
+                )
+
+
+def test_spatial_hash_matches_brute_force():
+    rng = random.Random(2)
+    grid = SpatialHash(40, 880)
+    positions = {item: [] for item in range(5)}
+    for item, item_positions in positions.items():
+        for _ in range(50):
+            position = rng.randint(0, 639) * 880 + rng.randint(0, 879)
+            item_positions.append(position)
+            grid.add(position, item)
+    for position in positions[0][:25]:
+        grid.remove(position, 0)
+    del positions[0][:25]
+    for _ in range(500):
+        point = rng.randint(0, 639) * 880 + rng.randint(0, 879)
+        for threshold in (40, 20):
+            expected = {
+                item for item, item_positions in positions.items()
+                if any(
+                    (p % 880 - point % 880) ** 2
+                    + (p // 880 - point // 880) ** 2 < threshold ** 2
+                    for p in item_positions
+                )
+            }
+            assert grid.query(point, threshold) == expected, (
+                'SpatialHash должен находить те же объекты, '
+                'что и полный перебор позиций.'
+            )
+            for item in positions:
+                assert grid.collides(point, threshold, item) == (
+                    item in expected
+                )
+
+
+def test_free_cells_tracks_occupancy_and_board_full():
+    free_cells = FreeCells(3, 2, 40)
+    assert len(free_cells) == 6
+    free_cells.add(121 + 41)
+    free_cells.add(39 * 120 + 79)
+    assert 40 not in free_cells, (
+        'Клетка должна считаться занятой, пока в нее попадает позиция.'
+    )
+    free_cells.remove(121 + 41)
+    assert 40 not in free_cells
+    free_cells.remove(39 * 120 + 79)
+    assert 40 in free_cells
+    rng = random.Random(3)
+    for _ in range(6):
+        free_cells.add(free_cells.random_cell(rng))
+    assert len(free_cells) == 0
+    with pytest.raises(BoardFullError):
+        free_cells.random_cell(rng)
+
+
+def test_free_cells_on_large_board_stay_sparse():
+    rng = random.Random(4)
+    free_cells = Board(500, 500, 40).free_cells()
+    assert len(free_cells) == 250000
+    taken = set()
+    for _ in range(3000):
+        if taken and rng.random() < 0.4:
+            cell = rng.choice(sorted(taken))
+            free_cells.remove(cell)
+            taken.remove(cell)
+        else:
+            cell = free_cells.random_cell(rng)
+            assert cell not in taken, (
+                'Случайная клетка должна выбираться только из свободных.'
+            )
+            free_cells.add(cell)
+            taken.add(cell)
+    assert len(free_cells) == 250000 - len(taken)
+    assert all(cell not in free_cells for cell in taken)
+    assert len(free_cells.order) <= 2 * len(taken) + 3000, (
+        'Память индекса свободных клеток не должна зависеть '
+        'от размера поля.'
+    )
+
+
+def test_scheduler_runs_only_due_timers():
+    scheduler = Scheduler()
+    fired = []
+    scheduler.at(5, lambda: fired.append('once'))
+    cancelled = scheduler.at(6, lambda: fired.append('cancelled'))
+    scheduler.every(4, lambda: fired.append('every'))
+    Scheduler.cancel(cancelled)
+    log = []
+    for tick in range(1, 13):
+        scheduler.run(tick)
+        log.append((tick, fired[:]))
+        fired.clear()
+    assert [(tick, f) for tick, f in log if f] == [
+        (4, ['every']), (5, ['once']), (8, ['every']), (12, ['every'])
+    ], 'Таймеры должны срабатывать только на своих тактах.'
+    assert len(scheduler) == 1, 'В очереди остается только периодический.'
+
+
+def test_board_packs_positions_into_ints():
+    board = Board(22, 16, 40)
+    position = board.pack(879, 639)
+    assert position == 639 * 880 + 879
+    assert board.unpack(position) == (879, 639)
+    assert board.is_close(board.pack(0, 0), board.pack(30, 20), 40)
+    assert not board.is_close(board.pack(0, 0), board.pack(40, 0), 40)
+
+
+def test_board_center_on_cell_grid_for_odd_sizes():
+    board = Board(23, 17, 40)
+    x, y = board.unpack(board.center)
+    assert (x % 40, y % 40) == (0, 0), (
+        'Центр поля с нечетным числом клеток должен лежать на сетке.'
+    )
+    assert (x, y) == (440, 320)
+    even_board = Board(22, 16, 40)
+    assert even_board.unpack(even_board.center) == (440, 320)
+
+
+def test_snake_body_memory_per_position():
+    board = Board(22, 16, 40)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    body = SnakeBody()
+    for step in range(12000):
+        body.push_head(board.pack(step % 880, step // 880 * 40))
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    assert used / len(body) < 100, (
+        'Позиция тела - одно int: вместе с индексом занятости '
+        'меньше 100 байт (с кортежами было около 150).'
+    )
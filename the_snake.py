@@ -1,5 +1,9 @@
-from datetime import datetime
-from random import choice, randint
+import argparse
+import hashlib
+import random
+from math import ceil, floor
+from collections import OrderedDict, deque
+from time import perf_counter
 from sys import exit
 
 import pygame as pg
@@ -7,59 +11,360 @@ from pygame import gfxdraw
 
 from settings import (
     GRID_SIZE, GRID_WIDTH, GRID_HEIGHT, SCREEN_WIDTH, SCREEN_HEIGHT,
-    CENTER, UP, DOWN, LEFT, RIGHT, BOARD_BACKGROUND_COLOR,
+    BOARD_WIDTH, BOARD_HEIGHT,
+    CAMERA_MARGIN, UP, DOWN, LEFT, RIGHT, BOARD_BACKGROUND_COLOR,
     TEXT_COLOR, SNAKE_COLOR, APPLE_COLOR, BOT_COLORS, STEALTH_COLOR,
-    SNACK_COLORS, SPEED_DELTA, EASY_START_SPEED, MAX_SPEED, TURNS, TURNS_BOT,
-    MODES_SWITCH_RULES, EASY, HARD, MODES_DISPLAY
+    SNACK_COLORS, SPEED_DELTA, EASY_START_SPEED, MAX_SPEED, TURNS,
+    MODES_SWITCH_RULES, EASY, HARD, MODES_DISPLAY, SCREEN_REFRESH,
+    CELLS_ERASED, SNACK_EATEN, SNACK_STOLEN, BOT_CAPTURED, GAME_OVER,
+    MODE_SWITCH, QUIT, KEY_PRESSED, RENDER_FPS, MAX_STEPS_PER_FRAME,
+    TEXT_CACHE_SIZE, HUD_MAX_REFRESH_RATE, PROFILER_TOGGLE, PIXEL_MOVEMENT,
+    CELL_MOVEMENT, MOVEMENTS, BOT_COUNT, BOT_REVIVAL_PERIOD,
+    SNACK_RETRY_PERIOD, PLANNER_WANDER_PERIOD, K_UP, K_DOWN, K_LEFT, K_RIGHT,
+    K_1, K_2, K_3, K_4, K_5, K_ESCAPE
+)
+from events import Event, EventBus
+from bot_policies import random_turns, turn_period
+from bots import BotColumns, ColumnBot, TurnSchedule
+from planner import Planner
+from profiler import Profiler
+from recording import Recorder
+from results import ResultsStore
+from structures import (
+    Board, BoardFullError, Scheduler, SnakeBody, SpatialHash
 )
 
 
-# Настройка игрового окна
-pg.init()
-screen = pg.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-surface = pg.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pg.SRCALPHA)
-GAME_FONT = pg.font.Font(None, 33)
 clock = pg.time.Clock()
+# Создаются в init_display: при импорте окно не открывается
+DISPLAY_ATTRIBUTES = ('screen', 'surface', 'GAME_FONT', 'text_cache')
+
+
+class DirtyRects:
+    """Области слоя surface, измененные с прошлого кадра.
+    Кадр переносит на экран только их, а после перезаливки
+    экрана - весь слой целиком.
+    """
+
+    def __init__(self):
+        """Первый кадр всегда выводится целиком"""
+        self.rects = []
+        self.full = True
+
+    def add(self, rect):
+        """Запоминает измененную область. Клетку часто стирают
+        и тут же рисуют заново, поэтому область внутри предыдущей
+        не добавляется, а охватывающая предыдущую заменяет ее.
+        """
+        if self.full:
+            return
+        rects = self.rects
+        if rects:
+            last = rects[-1]
+            if last.contains(rect):
+                return
+            if rect.contains(last):
+                rects[-1] = rect
+                return
+        rects.append(rect)
+
+    def add_full(self):
+        """Весь кадр нужно вывести заново"""
+        self.full = True
+        self.rects.clear()
+
+    def take(self):
+        """Возвращает (весь ли кадр, области) и начинает новый кадр"""
+        full, rects = self.full, self.rects
+        self.full, self.rects = False, []
+        return full, rects
+
+
+class Camera:
+    """Окно width x height пикселей на поле board.
+    Если поле больше окна, камера следит за головой змеи: когда
+    она подходит к краю окна ближе margin клеток, окно центрируется
+    на ней. Окно сдвигается скачком, а не каждый кадр, поэтому между
+    сдвигами перерисовываются только измененные области. Объекты
+    вне окна не рисуются.
+    """
+
+    def __init__(
+            self, board, width=SCREEN_WIDTH, height=SCREEN_HEIGHT,
+            margin=CAMERA_MARGIN
+    ):
+        """Камера в левом верхнем углу поля"""
+        self.width = width
+        self.height = height
+        self.margin = margin * GRID_SIZE
+        self.set_board(board)
+
+    def set_board(self, board):
+        """Переход на другое поле: окно снова в левом верхнем углу"""
+        self.board = board
+        self.left = self.top = 0
+        self.scrolls = (
+            board.pixel_width > self.width, board.pixel_height > self.height
+        )
+
+    def to_view(self, position):
+        """Координаты позиции поля в окне"""
+        if not any(self.scrolls):
+            return position
+        return (
+            self.axis_to_view(position[0], 0),
+            self.axis_to_view(position[1], 1)
+        )
+
+    def axis_to_view(self, value, axis):
+        """Координата по одной оси: клетка, заходящая в окно
+        слева или сверху через край поля, получает отрицательную
+        """
+        if not self.scrolls[axis]:
+            return value
+        size = (self.board.pixel_width, self.board.pixel_height)[axis]
+        value = (value - (self.left, self.top)[axis]) % size
+        return value - size if value > size - GRID_SIZE else value
+
+    def visible(self, position):
+        """Попадает ли клетка с углом в position в окно хотя бы частично"""
+        if not any(self.scrolls):
+            return True
+        x, y = self.to_view(position)
+        return x < self.width and y < self.height
+
+    def follow(self, position):
+        """Сдвиг окна к позиции, если она у края окна.
+        Возвращает True, если окно сдвинулось.
+        """
+        if not any(self.scrolls):
+            return False
+        x, y = self.to_view(position)
+        moved = False
+        if self.scrolls[0] and not (
+            self.margin <= x <= self.width - GRID_SIZE - self.margin
+        ):
+            self.left = (
+                position[0] - self.width // 2
+            ) % self.board.pixel_width
+            moved = True
+        if self.scrolls[1] and not (
+            self.margin <= y <= self.height - GRID_SIZE - self.margin
+        ):
+            self.top = (
+                position[1] - self.height // 2
+            ) % self.board.pixel_height
+            moved = True
+        return moved
+
+
+dirty_rects = DirtyRects()
+profiler = Profiler()
+# Поле по умолчанию и камера, через которую рисуются все объекты
+DEFAULT_BOARD = Board(BOARD_WIDTH, BOARD_HEIGHT, GRID_SIZE)
+camera = Camera(DEFAULT_BOARD)
+
+
+class TextCache:
+    """LRU-кэш надписей: (текст, цвет, сглаживание) -> Surface.
+    Счетчики hits и misses показывают, как часто удается
+    не растеризовать шрифт заново.
+    """
+
+    def __init__(self, font, max_size=TEXT_CACHE_SIZE):
+        """Кэш для шрифта font не больше max_size надписей"""
+        self.font = font
+        self.max_size = max_size
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, text, color, antialias=True):
+        """Надпись из кэша или новая отрисовка шрифтом"""
+        key = (text, tuple(color), antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = self.surfaces[key] = self.font.render(
+            text, antialias, color
+        )
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)
+        return surface
+
+
+def init_display():
+    """Настройка игрового окна: экран, слой surface и шрифт.
+    Вызывается при первой отрисовке или первом обращении к ним,
+    поэтому безголовым играм и тестам окно не нужно.
+    """
+    global screen, surface, GAME_FONT, text_cache
+    if 'screen' in globals():
+        return
+    pg.init()
+    screen = pg.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    surface = pg.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pg.SRCALPHA)
+    GAME_FONT = pg.font.Font(None, 33)
+    text_cache = TextCache(GAME_FONT)
+
+
+def __getattr__(name):
+    """Окно создается при первом обращении к the_snake.screen и т.п."""
+    if name in DISPLAY_ATTRIBUTES:
+        init_display()
+        return globals()[name]
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+class SpriteAtlas:
+    """Спрайты, отрисованные один раз для размера клетки grid_size:
+    скругленные ячейки каждого цвета, глаз змеи и яблоки с надписью силы.
+    Отрисовка объекта сводится к одному blit.
+    """
+
+    def __init__(self, grid_size=None):
+        """Заготовка спрайтов для всех цветов из settings.
+        Размер клетки по умолчанию - GRID_SIZE.
+        """
+        grid_size = self.grid_size = grid_size or GRID_SIZE
+        self.cells = {}
+        self.squares = {}
+        self.heads = {}
+        self.snacks = {}
+        self.eye = self.new_sprite()
+        center = grid_size // 2
+        gfxdraw.aacircle(
+            self.eye, center, center, grid_size // 6, BOARD_BACKGROUND_COLOR
+        )
+        gfxdraw.filled_circle(
+            self.eye, center, center, grid_size // 6, BOARD_BACKGROUND_COLOR
+        )
+        for color in (SNAKE_COLOR, *BOT_COLORS):
+            self.head(color)
+        for power in range(-3, 4):
+            self.snack(SNACK_COLORS[power], power)
+        self.snack(APPLE_COLOR, 1)
+        self.square(BOARD_BACKGROUND_COLOR)
+
+    def new_sprite(self):
+        """Прозрачный спрайт размером с клетку"""
+        return pg.Surface((self.grid_size, self.grid_size), pg.SRCALPHA)
+
+    def cell(self, color):
+        """Скругленная ячейка цвета color"""
+        sprite = self.cells.get(color)
+        if sprite is None:
+            sprite = self.cells[color] = self.new_sprite()
+            pg.draw.rect(
+                sprite, color, sprite.get_rect(), 0, self.grid_size
+            )
+        return sprite
+
+    def square(self, color):
+        """Квадратная непрозрачная ячейка (для стирания)"""
+        sprite = self.squares.get(color)
+        if sprite is None:
+            sprite = self.squares[color] = self.new_sprite()
+            sprite.fill(color)
+        return sprite
+
+    def head(self, color):
+        """Голова змеи: ячейка с глазом"""
+        sprite = self.heads.get(color)
+        if sprite is None:
+            sprite = self.heads[color] = self.cell(color).copy()
+            sprite.blit(self.eye, (0, 0))
+        return sprite
+
+    def snack(self, color, power):
+        """Яблоко с надписью силы"""
+        sprite = self.snacks.get((color, power))
+        if sprite is None:
+            sprite = self.snacks[(color, power)] = self.cell(color).copy()
+            sprite.blit(
+                GAME_FONT.render(f'{power:+}', True, BOARD_BACKGROUND_COLOR),
+                (self.grid_size // 5, self.grid_size // 4)
+            )
+        return sprite
+
+
+sprite_atlases = {}
+
+
+def get_sprite_atlas(grid_size=None):
+    """Атлас для размера клетки grid_size (по умолчанию - GRID_SIZE).
+    Атласы запоминаются по размеру клетки: объекты рисуются атласом
+    для клетки своего поля (structures.Board.cell_size). GRID_SIZE
+    и зависящие от него шаги змей и cell_span - константы, которые
+    читаются при импорте модуля.
+    """
+    grid_size = grid_size or GRID_SIZE
+    atlas = sprite_atlases.get(grid_size)
+    if atlas is None:
+        init_display()
+        atlas = sprite_atlases[grid_size] = SpriteAtlas(grid_size)
+    return atlas
 
 
 class GameObject:
-    """Общий функционал для игровых объектов"""
+    """Общий функционал для игровых объектов. Позиция объекта -
+    упакованный пиксель поля (см. structures.Board.pack).
+    """
+
+    __slots__ = ('body_color', 'board', 'position', 'is_active', 'rng')
 
-    def __init__(self, color=None):
-        """Инициализирует цвет и начальное положение"""
+    def __init__(self, color=None, rng=None, board=None):
+        """Инициализирует цвет и начальное положение.
+        rng - генератор случайных чисел (по умолчанию модуль random).
+        board - поле (по умолчанию DEFAULT_BOARD размером с окно).
+        """
         self.body_color = color
-        self.position = CENTER
+        self.board = board or DEFAULT_BOARD
+        self.position = self.board.center
         self.is_active = True
+        self.rng = rng or random
 
     def toggle_object(self):
         """Отключает и включает игровые объекты"""
         self.is_active = not self.is_active
 
-    def randomize_position(self, busy_cells=None):
-        """Метод меняет позицию объекта на случайную из возможных"""
-        if not busy_cells:
-            self.position = CENTER
+    def randomize_position(self, free_cells=None):
+        """Метод меняет позицию объекта на случайную свободную клетку.
+        Если свободных клеток нет - BoardFullError.
+        """
+        if free_cells is None:
+            self.position = self.board.center
             return
-        while self.position in busy_cells:
-            self.position = (
-                randint(0, (GRID_WIDTH - 1)) * GRID_SIZE,
-                randint(0, (GRID_HEIGHT - 1)) * GRID_SIZE
-            )
+        self.position = free_cells.random_cell(self.rng)
 
     def draw_cell(
             self, position, cell_color=None,
-            width=0, border_radius=GRID_SIZE
+            width=0, border_radius=None
     ):
-        """Метод для отрисовки одной ячейки"""
-        pg.draw.rect(
-            surface,
-            cell_color or self.body_color,
-            pg.Rect(
-                position,
-                (GRID_SIZE, GRID_SIZE)
-            ),
-            width, border_radius
-        )
+        """Метод для отрисовки одной ячейки спрайтом из атласа.
+        Скругление по умолчанию - размер клетки поля.
+        """
+        position = self.board.unpack(position)
+        if not camera.visible(position):
+            return
+        position = camera.to_view(position)
+        color = cell_color or self.body_color
+        cell_size = self.board.cell_size
+        if border_radius is None:
+            border_radius = cell_size
+        atlas = get_sprite_atlas(cell_size)
+        if width:
+            dirty_rects.add(pg.draw.rect(
+                surface, color,
+                pg.Rect(position, (cell_size, cell_size)),
+                width, border_radius
+            ))
+            return
+        sprite = atlas.cell(color) if border_radius else atlas.square(color)
+        dirty_rects.add(surface.blit(sprite, position))
 
     def erase_cell(self, position, cell_color=BOARD_BACKGROUND_COLOR):
         """Метод для стирания одной ячейки"""
@@ -79,78 +384,117 @@ class GameObject:
 class Apple(GameObject):
     """Класс для объектов, которые будет съедать змейка"""
 
-    def __init__(self, color=APPLE_COLOR, busy_cells=None, power=1):
+    __slots__ = ('power',)
+
+    def __init__(
+            self, color=APPLE_COLOR, free_cells=None, power=1, rng=None,
+            board=None
+    ):
         """Инициализация яблока"""
-        super().__init__(color)
-        self.randomize_position(busy_cells)
+        super().__init__(color, rng, board)
+        self.randomize_position(free_cells)
         self.power = power
 
     def draw(self):
-        """Отрисовка яблока"""
-        self.draw_cell(self.position)
-        self.display_power()
-
-    def display_power(self):
-        """Отображение силы яблока"""
-        if self.is_active:
-            surface.blit(
-                GAME_FONT.render(
-                    f'{self.power:+}',
-                    True, BOARD_BACKGROUND_COLOR
-                ),
-                (
-                    self.position[0] + GRID_SIZE / 5,
-                    self.position[1] + GRID_SIZE / 4
-                )
-            )
+        """Отрисовка яблока вместе с силой одним спрайтом"""
+        if not self.is_active:
+            self.draw_cell(self.position)
+            return
+        position = self.board.unpack(self.position)
+        if not camera.visible(position):
+            return
+        sprite = get_sprite_atlas(self.board.cell_size).snack(
+            self.body_color, self.power
+        )
+        dirty_rects.add(surface.blit(sprite, camera.to_view(position)))
 
 
 class Snake(GameObject):
-    """Класс змеи"""
+    """Класс змеи. Тело - позиции головы за каждый пиксель пути,
+    поэтому на одну клетку приходится cell_span = GRID_SIZE позиций,
+    а за такт (step_ticks = 1) голова проходит один пиксель.
+    """
 
-    def __init__(self, color=SNAKE_COLOR, busy_cells=None, length=1):
+    __slots__ = (
+        'initial_length', 'speed_mode', 'new_speed_mode', 'mode_display',
+        'best_result', 'next_direction', 'positions', 'length', 'speed',
+        'direction', 'last', 'repainting', 'moves'
+    )
+    cell_span = GRID_SIZE
+    step_ticks = 1
+    """Шаг головы прямо и на повороте; поворот идет по полю,
+    уменьшенному на turn_margin
+    """
+    move_step = 1
+    turn_step = GRID_SIZE // 4
+    turn_margin = GRID_SIZE // 2
+
+    def __init__(
+            self, color=SNAKE_COLOR, free_cells=None, length=1, rng=None,
+            board=None
+    ):
         """Инициализация змеи. Методом reset получаем данные для старта."""
-        super().__init__(color)
+        super().__init__(color, rng, board)
         self.initial_length = length * GRID_SIZE
         self.speed_mode = EASY_START_SPEED
         self.new_speed_mode = None
         self.mode_display = EASY
         self.best_result = {EASY: 1, HARD: 1}
         self.next_direction = None
-        self.reset()
+        self.positions = SnakeBody(offsets=self.body_offsets())
+        self.reset(free_cells)
 
-    def reset(self, busy_cells=None):
+    def reset(self, free_cells=None):
         """Сброс в начальную позицию"""
+        self.randomize_position(free_cells)
         self.length = self.initial_length
-        self.randomize_position(busy_cells)
-        self.positions = [self.position]
+        self.positions.reset(self.position)
         self.speed = self.speed_mode
-        self.direction = choice([UP, DOWN, LEFT, RIGHT])
+        self.direction = self.rng.choice([UP, DOWN, LEFT, RIGHT])
         self.last = None
+        self.repainting = False
+        """Шаги (голова, стертый хвост) с прошлой отрисовки:
+        за один кадр может пройти несколько тактов
+        """
+        self.moves = deque(maxlen=MAX_STEPS_PER_FRAME)
 
-    def draw(self):
-        """Отрисовка змеи"""
-        self.draw_cell(self.get_head_position())
-        if self.last:
-            self.erase_cell(
-                self.last,
-                cell_color=BOARD_BACKGROUND_COLOR
+    def draw(self, alpha=0):
+        """Отрисовка змеи: все шаги с прошлого кадра по порядку,
+        одним пакетом blits. Последняя голова рисуется вместе с глазом.
+        alpha (доля шага с прошлого такта) нужна только CellSnake.
+        """
+        atlas = get_sprite_atlas(self.board.cell_size)
+        cell = atlas.cell(self.body_color)
+        background = atlas.square(BOARD_BACKGROUND_COLOR)
+        moves = list(self.moves) or [(self.get_head_position(), None)]
+        self.moves.clear()
+        sprites = []
+        if self.repainting:
+            """Все тело заново: круги через GRID_SIZE // 8 пикселей
+            пути сливаются в ту же полосу
+            """
+            self.repainting = False
+            sprites.extend(
+                (cell, position)
+                for position in self.positions[::GRID_SIZE // 8]
             )
-        """Отрисовка глаза с использованием anti-aliasing"""
-        gfxdraw.aacircle(
-            surface,
-            self.get_head_position()[0] + GRID_SIZE // 2,
-            self.get_head_position()[1] + GRID_SIZE // 2,
-            GRID_SIZE // 6,
-            BOARD_BACKGROUND_COLOR
-        )
-        gfxdraw.filled_circle(
-            surface,
-            self.get_head_position()[0] + GRID_SIZE // 2,
-            self.get_head_position()[1] + GRID_SIZE // 2,
-            GRID_SIZE // 6,
-            BOARD_BACKGROUND_COLOR
-        )
+        for head, last in moves[:-1]:
+            sprites.append((cell, head))
+            if last:
+                sprites.append((background, last))
+        head, last = moves[-1]
+        sprites.append((atlas.head(self.body_color), head))
+        if last:
+            sprites.append((background, last))
+        points = [
+            (sprite, self.board.unpack(position))
+            for sprite, position in sprites
+        ]
+        for rect in surface.blits([
+            (sprite, camera.to_view(point))
+            for sprite, point in points if camera.visible(point)
+        ]):
+            dirty_rects.add(rect)
 
     def update_direction(self, new_direction):
         """Метод обновляет направление после нажатия на стрелку"""
@@ -166,51 +510,73 @@ class Snake(GameObject):
         """Обработка ситуации смены режимов изи и хард"""
         if self.new_speed_mode:
             self.handle_records()
-            self.save_result()
             self.speed_mode = self.new_speed_mode
             self.mode_display = MODES_DISPLAY[self.new_speed_mode]
             self.new_speed_mode = None
             self.reset()
-            Game.screen_refresh()
 
     def get_head_position(self):
         """Метод возвращает текущее положение головы"""
-        return self.positions[0]
+        return self.positions.head()
+
+    def body_offsets(self):
+        """Смещения от головы для быстрых проверок вхождения в тело:
+        захват бота и самоукус (см. SnakeBody.contains)
+        """
+        return (self.cell_span, self.cell_span * 3)
 
     def move(self):
         """
         Метод создает движение змеи, добавляя новое положение головы
         в начало списка и удаляя последний элемент, если длина не увеличилась.
         """
-        self.positions.insert(0, self.get_new_head_position())
+        self.advance(self.get_new_head_position())
+
+    def advance(self, head):
+        """Шаг на уже вычисленную голову head (см. move)"""
+        self.positions.push_head(head)
         if len(self.positions) // GRID_SIZE + 1 > self.length // GRID_SIZE:
-            self.last = self.positions.pop()
+            self.last = self.positions.pop_tail()
+        else:
+            self.last = None
+        self.moves.append((self.get_head_position(), self.last))
 
     def get_new_head_position(self):
         """Метод вычисляет новое положение головы
         в зависимости от того, был поворот или нет
         """
-        x, y = self.get_head_position()
+        width = self.board.pixel_width
+        head = self.get_head_position()
+        x, y = head % width, head // width
         if self.next_direction:
-            """Если был поворот, то длина шага на повороте: GRID_SIZE // 4"""
+            """Если был поворот, то длина шага на повороте: turn_step"""
             new_head_position = (
                 (
-                    x + self.next_direction[0] * (GRID_SIZE // 4)
-                ) % (SCREEN_WIDTH - GRID_SIZE // 2),
-                (
-                    y + self.next_direction[1] * (GRID_SIZE // 4)
-                ) % (SCREEN_HEIGHT - GRID_SIZE // 2)
+                    y + self.next_direction[1] * self.turn_step
+                ) % (self.board.pixel_height - self.turn_margin) * width
+                + (
+                    x + self.next_direction[0] * self.turn_step
+                ) % (width - self.turn_margin)
             )
             self.direction = self.next_direction
             self.next_direction = None
         else:
             """Если поворота не было"""
             new_head_position = (
-                (x + self.direction[0]) % SCREEN_WIDTH,
-                (y + self.direction[1]) % SCREEN_HEIGHT
+                (y + self.direction[1] * self.move_step)
+                % self.board.pixel_height * width
+                + (x + self.direction[0] * self.move_step) % width
             )
         return new_head_position
 
+    def body_cells(self):
+        """Число целых клеток тела"""
+        return len(self.positions) // GRID_SIZE
+
+    def repaint(self):
+        """Полная перерисовка змеи на следующем кадре"""
+        self.repainting = True
+
     def get_best_result(self):
         """Метод возвращает рекорд для текущего режима игры"""
         return self.best_result[self.mode_display]
@@ -222,27 +588,20 @@ class Snake(GameObject):
                 self.mode_display
             ] = self.length // GRID_SIZE
 
-    def show_info(self):
-        """Вывод информации в шапку окна"""
-        pg.display.set_caption(
-            f'Изгиб питона. Вы на {self.mode_display}. '
-            f'Длина: {self.length // GRID_SIZE} '
-            f'(рекорд: {self.get_best_result()}) '
-            f'Скорость: {(self.speed - EASY_START_SPEED) // SPEED_DELTA + 1} |'
-            f' ESC - выход | 1 - изи | 2 - хард | 3 - экстраз | 4 - боты'
-        )
+    def get_speed_level(self):
+        """Метод возвращает уровень скорости для отображения"""
+        return (self.speed - EASY_START_SPEED) // SPEED_DELTA + 1
 
-    def save_result(self):
-        """Сохраняет результат в файле"""
-        if len(self.positions) // GRID_SIZE > 3:
-            now = datetime.strftime(datetime.now(), '%d-%m-%Y, %H:%M:%S')
-            with open('results.txt', 'a', encoding='utf-8') as f:
-                f.write(
-                    f'Дата, время: {now}. '
-                    f'Длина змейки: {self.length // GRID_SIZE}. '
-                    f'Скорость: {(self.speed - EASY_START_SPEED) // SPEED_DELTA + 1}. '
-                    f'Режим: {self.mode_display}\n'
-                )
+    def get_result(self):
+        """Результат текущей игры для сохранения:
+        (длина, уровень скорости, режим) или None, если змея короткая
+        """
+        if self.body_cells() > 3:
+            return (
+                self.length // GRID_SIZE,
+                self.get_speed_level(),
+                self.mode_display
+            )
 
     def speed_affect(self, power):
         """Метод для изменения скорости после съедения яблок"""
@@ -253,59 +612,477 @@ class Snake(GameObject):
         self.speed = max(self.speed - SPEED_DELTA, self.speed_mode)
 
     def length_affect(self, power):
-        """Метод для изменения длины змеи после съедения яблок"""
+        """Метод для изменения длины змеи после съедения яблок.
+        Возвращает позиции, удаленные из хвоста.
+        """
         self.length = max(self.length + power * GRID_SIZE, GRID_SIZE)
         if power < 0:
-            self.erase_snake_parts(abs(power) * GRID_SIZE)
+            return self.erase_snake_parts(abs(power) * self.cell_span)
+        return []
 
     def erase_snake_parts(self, cell_num):
-        """Метод для стирания нескольких блоков из хвоста змеи
-        (после съедения яблок с отрицательной силой)
+        """Метод для удаления нескольких блоков из хвоста змеи
+        (после съедения яблок с отрицательной силой).
+        Возвращает удаленные позиции, чтобы их можно было стереть.
+        """
+        cell_num = min(cell_num, len(self.positions) - self.cell_span)
+        return [self.positions.pop_tail() for _ in range(cell_num)]
+
+
+class CellSnake(Snake):
+    """Змея клеточной модели движения: одна позиция на клетку,
+    и за такт (step_ticks = GRID_SIZE тактов пиксельной модели)
+    голова проходит целую клетку. Плавность между клетками появляется
+    только при отрисовке. Клетки пути нумеруются по порядку добавления,
+    поэтому точка пути задается дробным номером: u между клетками
+    floor(u) и floor(u) + 1.
+    """
+
+    __slots__ = ('band', 'pushed', 'popped', 'drawn')
+    cell_span = 1
+    step_ticks = GRID_SIZE
+    """Поворот - на границе клетки, тем же шагом"""
+    move_step = GRID_SIZE
+    turn_step = GRID_SIZE
+    turn_margin = 0
+
+    def reset(self, free_cells=None):
+        """Сброс в начальную позицию"""
+        super().reset(free_cells)
+        """Шагов с начала (пока змея вытягивается из одной клетки),
+        номер следующей клетки пути и клетки, ушедшие из хвоста
+        с прошлой отрисовки
+        """
+        self.band = 0
+        self.pushed = 1
+        self.popped = deque(maxlen=MAX_STEPS_PER_FRAME * 4)
+        self.drawn = None
+
+    def advance(self, head):
+        """Шаг на клетку. Тело хранит length // GRID_SIZE + 1 клеток:
+        видимая змея лежит между последними клетками с учетом доли шага.
         """
-        cell_num = min(cell_num, len(self.positions) - GRID_SIZE)
-        for _ in range(cell_num):
-            self.erase_cell(self.positions.pop())
+        self.band = min(self.band + 1, self.length // GRID_SIZE)
+        self.positions.push_head(head)
+        self.pushed += 1
+        self.last = None
+        if len(self.positions) > self.length // GRID_SIZE + 1:
+            self.last = self.positions.pop_tail()
+            self.popped.append(self.last)
+
+    def body_cells(self):
+        """Число целых клеток тела (голова и хвост - в пути)"""
+        return len(self.positions) - 2
+
+    def erase_snake_parts(self, cell_num):
+        """Удаление клеток из хвоста с учетом их для отрисовки"""
+        erased = super().erase_snake_parts(cell_num)
+        self.popped.extend(erased)
+        return erased
+
+    def repaint(self):
+        """Полная перерисовка змеи на следующем кадре"""
+        self.drawn = None
+
+    def path(self, seq):
+        """Координаты клетки пути с номером seq (в теле или недавно
+        ушедшей)
+        """
+        tail_seq = self.pushed - len(self.positions)
+        if seq >= tail_seq:
+            position = self.positions[self.pushed - 1 - seq]
+        else:
+            position = self.popped[seq - tail_seq + len(self.popped)]
+        return self.board.unpack(position)
+
+    def point(self, u):
+        """Точка пути с дробным номером u в пикселях"""
+        seq = floor(u)
+        x, y = self.path(seq)
+        if u == seq:
+            return x, y
+        dx, dy = self.board.step_between((x, y), self.path(seq + 1))
+        return x + dx * (u - seq), y + dy * (u - seq)
+
+    def polyline(self, start, end):
+        """Точки пути от номера start до end через клетки между ними"""
+        points = [self.point(start)]
+        points.extend(
+            self.path(seq) for seq in range(floor(start) + 1, ceil(end))
+        )
+        if end > start:
+            points.append(self.point(end))
+        return points
+
+    @staticmethod
+    def fill(color, rect):
+        """Заливка части rect внутри слоя surface. Surface.fill
+        не обрезает прямоугольник с отрицательным углом, а сдвигает его
+        в угол слоя, поэтому у края окна он обрезается заранее.
+        """
+        return surface.fill(color, rect.clip(surface.get_rect()))
+
+    def paint(self, start, end, cell, rects):
+        """Участок тела от start до end: круги в точках пути
+        и прямоугольники между их центрами, как у пиксельной змеи
+        """
+        points = self.polyline(start, end)
+        for point, next_point in zip(points, points[1:]):
+            if not (camera.visible(point) or camera.visible(next_point)):
+                continue
+            dx, dy = self.board.step_between(point, next_point)
+            x, y = camera.to_view(point)
+            rects.append(surface.blit(cell, (round(x), round(y))))
+            if not (dx or dy):
+                continue
+            rects.append(self.fill(self.body_color, pg.Rect(
+                round(min(x, x + dx) + (GRID_SIZE // 2 if dx else 0)),
+                round(min(y, y + dy) + (GRID_SIZE // 2 if dy else 0)),
+                abs(round(dx)) if dx else GRID_SIZE,
+                abs(round(dy)) if dy else GRID_SIZE
+            )))
+        if camera.visible(points[-1]):
+            x, y = camera.to_view(points[-1])
+            rects.append(surface.blit(cell, (round(x), round(y))))
+
+    def wipe(self, start, end, rects):
+        """Стирание пути от start до end квадратами клеток.
+        Прямоугольник берется с запасом до целых пикселей: paint
+        округляет дробные точки, и без запаса от прошлых кадров
+        оставались полоски в пиксель.
+        """
+        if end <= start:
+            return
+        points = self.polyline(start, end)
+        for point, next_point in zip(points, points[1:]):
+            if not (camera.visible(point) or camera.visible(next_point)):
+                continue
+            dx, dy = self.board.step_between(point, next_point)
+            x, y = camera.to_view(point)
+            left, top = floor(min(x, x + dx)), floor(min(y, y + dy))
+            rects.append(self.fill(BOARD_BACKGROUND_COLOR, pg.Rect(
+                left, top,
+                ceil(max(x, x + dx)) - left + GRID_SIZE,
+                ceil(max(y, y + dy)) - top + GRID_SIZE
+            )))
+
+    def draw(self, alpha=0):
+        """Отрисовка с интерполяцией: голова прошла долю alpha пути
+        от предпоследней клетки к последней. Перерисовываются только
+        концы змеи: стирается путь, пройденный хвостом, и дорисовывается
+        путь головы с прошлого кадра.
+        """
+        atlas = get_sprite_atlas(self.board.cell_size)
+        cell = atlas.cell(self.body_color)
+        alpha = min(max(alpha, 0), 1)
+        head = self.pushed - 1
+        if len(self.positions) > 1:
+            head -= 1 - alpha
+        span = min(self.band - 1 + alpha, self.length // GRID_SIZE - 1)
+        tail = max(head - max(span, 0), self.pushed - len(self.positions))
+        rects = []
+        if self.drawn is None:
+            self.paint(tail, head, cell, rects)
+        else:
+            lowest = self.pushed - len(self.positions) - len(self.popped)
+            old_head, old_tail = self.drawn
+            self.wipe(max(old_tail, lowest), tail, rects)
+            self.paint(min(max(old_head, tail), head), head, cell, rects)
+            self.paint(tail, min(tail + 1, head), cell, rects)
+        if camera.visible(self.point(head)):
+            x, y = camera.to_view(self.point(head))
+            rects.append(surface.blit(
+                atlas.head(self.body_color), (round(x), round(y))
+            ))
+        self.drawn = (head, tail)
+        self.popped.clear()
+        for rect in rects:
+            dirty_rects.add(rect)
+
+
+class SnakeBot(ColumnBot, Snake):
+    """Бот пиксельной модели с состоянием в столбцах (см. bots)"""
+
+    __slots__ = ('columns', 'index')
+
+
+class CellBot(ColumnBot, CellSnake):
+    """Бот клеточной модели с состоянием в столбцах (см. bots)"""
+
+    __slots__ = ('columns', 'index')
+
+
+# Классы змей и ботов по моделям движения (см. Game)
+SNAKE_MODELS = {PIXEL_MOVEMENT: Snake, CELL_MOVEMENT: CellSnake}
+BOT_MODELS = {PIXEL_MOVEMENT: SnakeBot, CELL_MOVEMENT: CellBot}
 
 
 class Game:
     """
     Класс игры, в котором создаются игровые объеты, запускается
-    движение, отрисовка и логика взаимодействия
+    движение и логика взаимодействия. Game ничего не рисует:
+    каждый такт (step) возвращает список событий (events.Event)
+    и одной пачкой передает их подписчикам шины self.bus
+    (отрисовке Renderer, хранилищу результатов, записи нажатий).
     """
 
-    def __init__(self):
-        """Инициализация игровых объектов"""
-        self.snake = Snake()
-        hold_cells = [*self.snake.positions]
-        self.apple = Apple(busy_cells=hold_cells)
-        hold_cells.append(self.apple.position)
+    def __init__(
+            self, seed=None, bot_policies=None, results=None,
+            movement=PIXEL_MOVEMENT, board=None, bot_count=BOT_COUNT,
+            batched_bots=True
+    ):
+        """Инициализация игровых объектов.
+        seed - зерно генератора случайных чисел для повторяемых игр.
+        movement - модель движения змей (см. SNAKE_MODELS): в клеточной
+        за такт проходится клетка, и тактов в GRID_SIZE раз меньше.
+        board - поле (см. structures.Board), по умолчанию размером с окно.
+        bot_count - количество ботов.
+        batched_bots - состояние ботов хранится столбцами (см. bots)
+        и обновляется одним проходом за такт. False - эталонный
+        вариант: каждый бот - отдельная змея self.snake_class.
+        bot_policies - стратегии поворотов ботов (см. bot_policies),
+        по одной на бота. Ботам без стратегии достается random_turns,
+        а лишние стратегии - ValueError. Стратегии хранятся кортежем:
+        стратегию одного бота меняет только set_bot_policy.
+        results - хранилище результатов (см. results.ResultsStore),
+        из него берутся рекорды, и оно сохраняет новые результаты.
+        """
+        self.rng = random.Random(seed)
+        self.movement = movement
+        self.snake_class = SNAKE_MODELS[movement]
+        """Такты пиксельной модели за один шаг: таймер идет в них,
+        чтобы периоды событий не зависели от модели
+        """
+        self.step_ticks = self.snake_class.step_ticks
+        self.board = board or DEFAULT_BOARD
+        self.free_cells = self.board.free_cells()
+        """Поля расстояний до яблок, общие для ботов path_planner"""
+        self.planner = Planner(self.board)
+        self.snake = self.snake_class(rng=self.rng, board=self.board)
+        self.results = results
+        if results is not None:
+            self.snake.best_result.update(results.best_results())
+        self.snake.positions.attach(self.free_cells, self.snake)
+        self.apple = Apple(
+            free_cells=self.free_cells, rng=self.rng, board=self.board
+        )
+        self.free_cells.add(self.apple.position)
         self.bot_capture_amount = 0
         self.captured_bot = None
         self.timer = 0
+        """Таймеры игры (см. structures.Scheduler): возвращение
+        захваченного бота и яблок, не поместившихся на поле
+        """
+        self.scheduler = Scheduler()
+        self.revival = None
+        self.events = []
+        self.bus = EventBus()
+        if results is not None:
+            self.bus.subscribe(results)
+        """Сетка для быстрого поиска столкновений с ботами"""
+        self.bot_cells = SpatialHash(GRID_SIZE, self.board.pixel_width)
         """Инициализация ботов"""
         self.bots = []
-        for num in range(2, 4):
-            color = BOT_COLORS[num - 2]
-            length = num - 1
-            bot = Snake(
-                color=color,
-                busy_cells=hold_cells,
-                length=length
+        self.bot_policies = ()
+        self.bot_columns = BotColumns() if batched_bots else None
+        """Такты, на которых ботов спрашивают о повороте, и таймер
+        случайных поворотов ботов path_planner
+        """
+        self.bot_turns = TurnSchedule()
+        self.bot_turns.watch(PLANNER_WANDER_PERIOD)
+        bot_policies = tuple(bot_policies or ())
+        if len(bot_policies) > bot_count:
+            raise ValueError(
+                f'Стратегий ботов {len(bot_policies)}, а ботов {bot_count}'
             )
-            self.bots.append(bot)
-            hold_cells.extend(bot.positions)
-        """Инициализация яблок разных видов"""
+        bot_policies += (random_turns,) * (bot_count - len(bot_policies))
+        for num, policy in enumerate(bot_policies):
+            self.add_bot(
+                BOT_COLORS[num % len(BOT_COLORS)], length=num % 2 + 1,
+                policy=policy
+            )
+        """Инициализация яблок разных видов. Зоны яблок (клетка сетки ->
+        яблоки, до которых из нее может дотянуться голова) пересчитываются
+        при смене версии, то есть после перемещения яблока.
+        """
         self.snacks = [self.apple]
+        self.snacks_version = 0
+        self.zones = (None, {})
         for num in range(-3, 4):
-            color = SNACK_COLORS[num]
-            power = num
-            snack = Apple(
-                color=color,
-                busy_cells=hold_cells,
-                power=power
+            self.add_snack(SNACK_COLORS[num], power=num)
+
+    def add_bot(self, color, length=1, policy=random_turns):
+        """Новый змеебот на свободной клетке со стратегией policy"""
+        details = dict(
+            color=color,
+            free_cells=self.free_cells,
+            length=length,
+            rng=self.rng,
+            board=self.board
+        )
+        if self.bot_columns is None:
+            bot = self.snake_class(**details)
+        else:
+            bot = BOT_MODELS[self.movement](self.bot_columns, **details)
+        self.bot_turns.add(turn_period(policy, len(self.bots)), self.timer)
+        self.bots.append(bot)
+        self.bot_policies += (policy,)
+        bot.positions.attach(self.bot_cells, bot)
+        bot.positions.attach(self.free_cells, bot)
+        return bot
+
+    def set_bot_policy(self, index, policy):
+        """Новая стратегия policy бота номер index. Период его
+        поворотов меняется сразу: повороты на прошедших тактах сделаны.
+        """
+        policies = self.bot_policies
+        self.bot_policies = policies[:index] + (policy,) + policies[index + 1:]
+        self.bot_turns.set_period(
+            index, turn_period(policy, index), self.timer
+        )
+
+    def add_snack(self, color, power):
+        """Новое яблоко силы power на свободной клетке"""
+        snack = Apple(
+            color=color,
+            free_cells=self.free_cells,
+            power=power,
+            rng=self.rng,
+            board=self.board
+        )
+        self.snacks.append(snack)
+        self.snacks_version += 1
+        self.free_cells.add(snack.position)
+        return snack
+
+    def hide_extras(self):
+        """Прячет ботов и экстразы, как в начале игры в окне.
+        Они появляются по клавишам 3 и 4.
+        """
+        for bot in self.bots:
+            bot.toggle_object()
+        for snack in self.snacks[1:]:
+            snack.toggle_object()
+
+    def state_hash(self):
+        """Хэш состояния игры для проверки повторов (см. replay)"""
+        unpack = self.board.unpack
+        snakes = tuple(
+            (
+                tuple(map(unpack, snake.positions)), snake.direction,
+                snake.length, snake.speed, snake.speed_mode, snake.is_active
             )
-            self.snacks.append(snack)
-            hold_cells.append(snack.position)
+            for snake in [self.snake, *self.bots]
+        )
+        snacks = tuple(
+            (unpack(snack.position), snack.is_active) for snack in self.snacks
+        )
+        state = (
+            self.timer, self.bot_capture_amount, snakes, snacks,
+            self.rng.getstate()
+        )
+        return hashlib.sha256(repr(state).encode()).digest()
+
+    def get_near_snacks(self, position):
+        """Яблоки рядом с позицией в порядке списка self.snacks
+        (зона клетки сетки, см. snack_zones). Только для них имеет
+        смысл проверять столкновение. Список общий: менять его нельзя.
+        """
+        return self.snack_zones().get(self.zone_of(position), ())
+
+    def zone_of(self, position):
+        """Номер клетки сетки зон яблок, в которую попадает позиция:
+        y * (width + 1) + x. Лишняя клетка в строке не дает соседям
+        с краев разных строк попасть в одну зону.
+        """
+        board = self.board
+        return (
+            position // board.pixel_width // board.cell_size
+            * (board.width + 1)
+            + position % board.pixel_width // board.cell_size
+        )
+
+    def emit(self, kind, data=None):
+        """Добавляет событие в список событий текущего такта"""
+        self.events.append(Event(kind, data))
+
+    def step(self, actions=()):
+        """Один такт игры без отрисовки.
+        actions - коды нажатых клавиш. Возвращает события такта:
+        список заполняется заново на каждом такте.
+        """
+        self.events.clear()
+        self.timer += self.step_ticks
+        with profiler.phase('keys'):
+            for key in actions:
+                self.emit(KEY_PRESSED, key)
+                Game.handle_key_down(
+                    key, self, self.snake, self.snacks[1:], self.bots
+                )
+        with profiler.phase('move'):
+            self.handle_speed_mode_change()
+            self.snake.move()
+        with profiler.phase('selfbite'):
+            self.handle_selfbite()
+        with profiler.phase('objects_activity'):
+            self.handle_objects_activity()
+        with profiler.phase('collisions'):
+            head = self.snake.get_head_position()
+            for snack in self.get_near_snacks(head):
+                self.handle_eat_snack(snack)
+            self.handle_bots_collisions()
+        self.scheduler.run(self.timer)
+        with profiler.phase('observers'):
+            self.bus.publish(self, self.events)
+        return self.events
+
+    def handle_speed_mode_change(self):
+        """Смена режима изи/хард: результат сохраняется,
+        змея начинает заново
+        """
+        if self.snake.new_speed_mode:
+            self.emit(MODE_SWITCH, self.snake.get_result())
+            self.snake.handle_speed_mode_change()
+            self.emit(SCREEN_REFRESH)
+
+    def cut_tail(self, snake, power):
+        """Меняет длину змеи и сообщает о стертом хвосте"""
+        erased = snake.length_affect(power)
+        if erased:
+            self.emit(CELLS_ERASED, (snake, erased))
+
+    def relocate_snack(self, snack):
+        """Стирает яблоко и перемещает его в свободную клетку.
+        Если поле заполнено, яблоко прячется на старом месте
+        до освобождения клеток (см. restore_snack).
+        """
+        old_position = snack.position
+        self.emit(CELLS_ERASED, (snack, [old_position]))
+        try:
+            snack.randomize_position(self.free_cells)
+        except BoardFullError:
+            snack.is_active = False
+            self.retry_snack(snack)
+            return
+        self.free_cells.move(old_position, snack.position)
+        self.snacks_version += 1
+
+    def retry_snack(self, snack):
+        """Попытка поставить яблоко через SNACK_RETRY_PERIOD тактов"""
+        self.scheduler.at(
+            self.timer + SNACK_RETRY_PERIOD, lambda: self.restore_snack(snack)
+        )
+
+    def restore_snack(self, snack):
+        """Ставит спрятанное на заполненном поле яблоко в свободную
+        клетку и включает его. Пока поле заполнено, попытка
+        повторяется через SNACK_RETRY_PERIOD тактов.
+        """
+        if not len(self.free_cells):
+            self.retry_snack(snack)
+            return
+        self.relocate_snack(snack)
+        snack.is_active = True
 
     def handle_eat_snack(self, snack):
         """Если змейка съедает неспрятанное яблоко, то сила яблока
@@ -318,22 +1095,16 @@ class Game:
                 snack.position
             )
         ):
-            self.snake.length_affect(snack.power)
+            self.cut_tail(self.snake, snack.power)
             self.snake.speed_affect(snack.power)
-            snack.erase_cell(snack.position)
-            snack.randomize_position(
-                (
-                    *self.snake.positions,
-                    *[pos for bot in self.bots for pos in bot.positions],
-                    *[snack.position for snack in self.snacks]
-                )
-            )
+            self.relocate_snack(snack)
+            self.emit(SNACK_EATEN, snack)
 
     def handle_selfbite(self):
         """Обработка ситуации самоукуса"""
-        if self.snake.get_head_position() in self.snake.positions[
-            GRID_SIZE * 3:
-        ]:
+        if self.snake.positions.contains(
+            self.snake.get_head_position(), self.snake.cell_span * 3
+        ):
             self.handle_game_over()
 
     def handle_steal_snack(self, bot, snack):
@@ -348,15 +1119,9 @@ class Game:
                 snack.position
             )
         ):
-            bot.length_affect(snack.power)
-            snack.erase_cell(snack.position)
-            snack.randomize_position(
-                (
-                    *self.snake.positions,
-                    *[pos for bot in self.bots for pos in bot.positions],
-                    *[snack.position for snack in self.snacks]
-                )
-            )
+            self.cut_tail(bot, snack.power)
+            self.relocate_snack(snack)
+            self.emit(SNACK_STOLEN, (bot, snack))
 
     def handle_smash(self, bot):
         """Если змей врезается головой в неспрятанного бота,
@@ -368,39 +1133,51 @@ class Game:
         Также и наоборот: пока бот маленький (одна голова) - в него
         нельзя врезаться, чтобы не было лишнего хаоса при ресете.
         """
-        for pos in bot.positions:
-            if (
-                bot.is_active
-                and self.snake.length > GRID_SIZE
-                and bot.length > GRID_SIZE
-                and self.is_collision(
-                    self.snake.get_head_position(),
-                    pos, threshold=GRID_SIZE / 2
-                )
-            ):
-                self.handle_game_over()
-
-    def handle_bot_capture(self, bot):
-        """Захват змеебота, т.е. если змеебот врезается в змейку"""
         if (
             bot.is_active
-            and bot.get_head_position() in self.snake.positions[GRID_SIZE:]
+            and self.snake.length > GRID_SIZE
+            and bot.length > GRID_SIZE
+            and self.bot_cells.collides(
+                self.snake.get_head_position(),
+                GRID_SIZE / 2, bot
+            )
         ):
+            self.handle_game_over()
+
+    def handle_bot_capture(self, bot):
+        """Захват змеебота, т.е. если змеебот врезается в змейку.
+        Активность и голову бота из популяции читаем прямо из столбцов,
+        минуя свойства ColumnBot.
+        """
+        columns = self.bot_columns
+        if columns is None:
+            if not bot.is_active:
+                return
+            head = bot.get_head_position()
+        elif columns.active[bot.index]:
+            head = columns.heads[bot.index]
+        else:
+            return
+        if self.snake.positions.contains(head, self.snake.cell_span):
             self.snake.length_affect(bot.length // GRID_SIZE)
             self.snake.speed_affect(power=1)
             self.bot_capture_amount += 1
-            [bot.erase_cell(pos) for pos in bot.positions[GRID_SIZE:]]
-            bot.reset(
-                (
-                    *self.snake.positions,
-                    *[pos for bot in self.bots for pos in bot.positions],
-                    *[snack.position for snack in self.snacks]
-                )
-            )
+            self.emit(CELLS_ERASED, (bot, bot.positions[bot.cell_span:]))
+            self.emit(BOT_CAPTURED, bot)
+            try:
+                bot.reset(self.free_cells)
+            except BoardFullError:
+                bot.reset()
             """Чтобы снизить хаос, временно выключаем захваченного бота"""
             if not self.captured_bot:
                 bot.toggle_object()
                 self.captured_bot = bot
+                self.revival = self.scheduler.at(
+                    Scheduler.next_tick(
+                        BOT_REVIVAL_PERIOD, self.timer - self.step_ticks
+                    ),
+                    lambda: Game.handle_captured_bot(self)
+                )
 
     @classmethod
     def handle_captured_bot(cls, self):
@@ -408,146 +1185,571 @@ class Game:
         if self.captured_bot:
             self.captured_bot.toggle_object()
             self.captured_bot = None
+            Scheduler.cancel(self.revival)
+            self.revival = None
 
     def handle_game_over(self):
         """Обработка окончания игры"""
         Game.handle_captured_bot(self)
-        self.snake.save_result()
+        self.emit(GAME_OVER, self.snake.get_result())
         self.snake.handle_records()
         self.snake.reset()
-        self.screen_refresh()
-
-    def display_info(self):
-        """Отображение дополнительной информации на экране"""
-        if self.bot_capture_amount > 0:
-            screen.blit(
-                GAME_FONT.render(
-                    f'Пошла охота на змееботов! '
-                    f'Вы захватили: {self.bot_capture_amount} шт.',
-                    True, TEXT_COLOR
-                ),
-                (GRID_SIZE // 3, GRID_SIZE // 4))
+        self.emit(SCREEN_REFRESH)
 
     def handle_objects_activity(self):
-        """Отрисовывает и двигает объекты в зависимости
-        от их статуса активности
-        """
-        for snack in self.snacks:
-            if snack.is_active:
-                snack.draw()
+        """Двигает ботов в зависимости от их статуса активности"""
+        if self.bot_columns is not None:
+            self.move_bot_columns()
+            self.turn_bot_columns()
+            return
         for bot in self.bots:
             if bot.is_active:
-                bot.draw()
                 bot.move()
-                self.make_bots_turns()
+        self.make_bots_turns()
 
     def make_bots_turns(self):
-        """Поворачивает ботов по таймеру"""
-        if not self.timer % 140:
-            self.handle_bot_turns(self.bots[0])
-        if not self.timer % 200:
-            self.handle_bot_turns(self.bots[1])
+        """Поворачивает активных ботов, которым пора
+        поворачивать, по их стратегиям
+        """
+        for index in self.bot_turns.turning(self.timer):
+            bot = self.bots[index]
+            if bot.is_active:
+                direction = self.bot_policies[index](self, index)
+                if direction:
+                    bot.update_direction(direction)
 
-    def handle_bot_turns(self, bot):
-        """Создает случайные повороты при движении бота"""
-        bot.update_direction(choice(TURNS_BOT.get(bot.direction)))
+    def move_bot_columns(self):
+        """Шаг всех активных ботов одним проходом по столбцам.
+        Тела ботов обновляются в порядке номеров, как у эталона.
+        """
+        columns = self.bot_columns
+        model = BOT_MODELS[self.movement]
+        indexes = columns.active_indexes()
+        columns.next_heads(
+            indexes, self.board.pixel_width, self.board.pixel_height,
+            model.move_step, model.turn_step, model.turn_margin
+        )
+        heads = columns.heads
+        for index in indexes:
+            self.bots[index].advance(heads[index])
 
-    @classmethod
-    def handle_user_events(cls, game, snake, snacks, bots):
-        """Общая обработка действий пользователя"""
-        for event in pg.event.get():
-            if event.type == pg.QUIT:
-                Game.handle_quit()
-            if event.type == pg.KEYDOWN:
-                Game.handle_key_down(event.key, game, snake, snacks, bots)
+    def turn_bot_columns(self):
+        """Спрашивает о повороте только тех ботов, чей период
+        поворотов пришелся на этот такт (см. bots.TurnSchedule.turning)
+        """
+        columns = self.bot_columns
+        for index in self.bot_turns.turning(self.timer):
+            if columns.active[index]:
+                direction = self.bot_policies[index](self, index)
+                if direction:
+                    columns.next_directions[index] = direction
+
+    def snack_zones(self):
+        """Клетка сетки -> яблоки в порядке self.snacks, до которых
+        может дотянуться голова из этой клетки (см. get_near_snacks)
+        """
+        version, zones = self.zones
+        if version != self.snacks_version:
+            zones = {}
+            stride = self.board.width + 1
+            for snack in self.snacks:
+                cell = self.zone_of(snack.position)
+                for dx in (-1, 0, 1):
+                    for dy in (-1, 0, 1):
+                        zones.setdefault(
+                            cell + dy * stride + dx, []
+                        ).append(snack)
+            self.zones = (self.snacks_version, zones)
+        return zones
+
+    def handle_bots_collisions(self):
+        """Столкновения змеи с ботами и кражи яблок ботами.
+        Столбцы сужают круг проверок: точные проверки и их порядок
+        остаются прежними (handle_smash, handle_bot_capture,
+        handle_steal_snack).
+        """
+        if self.bot_columns is None:
+            for bot in self.bots:
+                self.handle_smash(bot)
+                self.handle_bot_capture(bot)
+                for snack in self.get_near_snacks(bot.get_head_position()):
+                    self.handle_steal_snack(bot, snack)
+            return
+        smashing = self.bot_cells.query(
+            self.snake.get_head_position(), GRID_SIZE / 2
+        )
+        active = self.bot_columns.active
+        heads = self.bot_columns.heads
+        for index, bot in enumerate(self.bots):
+            if not active[index]:
+                continue
+            if bot in smashing:
+                self.handle_smash(bot)
+            if self.snake.positions.contains(
+                heads[index], self.snake.cell_span
+            ):
+                self.handle_bot_capture(bot)
+            for snack in self.get_near_snacks(heads[index]):
+                self.handle_steal_snack(bot, snack)
 
     @classmethod
     def handle_key_down(cls, key, game, snake, snacks, bots):
         """Обработка нажатия клавиш"""
-        if key == pg.K_ESCAPE:
-            Game.handle_quit()
+        if key == K_ESCAPE:
+            game.emit(QUIT)
         if (
-            key == pg.K_UP or key == pg.K_DOWN
-            or key == pg.K_LEFT or key == pg.K_RIGHT
+            key == K_UP or key == K_DOWN
+            or key == K_LEFT or key == K_RIGHT
         ):
             snake.update_direction(
                 TURNS.get((snake.direction, key))
             )
-        if key == pg.K_1 or key == pg.K_2:
+        if key == K_1 or key == K_2:
             snake.update_speed_mode(
                 MODES_SWITCH_RULES.get(
                     (snake.speed_mode, key))
             )
-            Game.screen_refresh()
-        if key == pg.K_3:
+            game.emit(SCREEN_REFRESH)
+        if key == K_3:
             for snack in snacks:
                 snack.toggle_object()
-            Game.screen_refresh()
-        if key == pg.K_4:
+            game.emit(SCREEN_REFRESH)
+        if key == K_4:
             """Перед выключением ботов - нужно обнулить статус
             захваченного бота для корректной работы этой опции
             """
             Game.handle_captured_bot(game)
             for bot in bots:
                 bot.toggle_object()
-            Game.screen_refresh()
+            game.emit(SCREEN_REFRESH)
+        if key == K_5:
+            game.emit(PROFILER_TOGGLE)
+
+    def is_collision(self, position1, position2, threshold=GRID_SIZE):
+        """Метод проверяет, есть ли столкновение"""
+        return self.board.is_close(position1, position2, threshold)
+
+    @staticmethod
+    def handle_quit():
+        """Выход из программы. Результаты игры к этому моменту уже
+        сохранены: хранилище подписано на QUIT раньше отрисовки.
+        """
+        pg.quit()
+        exit()
+
+
+class HudModel:
+    """Наблюдаемые значения HUD (режим, длина, рекорд, скорость, захваты).
+    Подписчик вызывается, только если изменилось одно из его значений,
+    и не чаще, чем раз в min_interval секунд.
+    """
+
+    def __init__(self, min_interval=0, clock=perf_counter):
+        """Источник времени clock возвращает секунды"""
+        self.values = {}
+        self.changed = set()
+        self.subscribers = []
+        self.min_interval = min_interval
+        self.clock = clock
+        self.published_at = None
+
+    def subscribe(self, callback, keys):
+        """Подписка callback(values) на изменения ключей keys"""
+        self.subscribers.append((callback, frozenset(keys)))
+
+    def update(self, **values):
+        """Обновляет значения. Возвращает True, если подписчики
+        были оповещены об изменениях.
+        """
+        for key, value in values.items():
+            if key not in self.values or self.values[key] != value:
+                self.values[key] = value
+                self.changed.add(key)
+        if not self.changed:
+            return False
+        now = self.clock()
+        if (
+            self.published_at is not None
+            and now - self.published_at < self.min_interval
+        ):
+            return False
+        self.published_at = now
+        changed, self.changed = self.changed, set()
+        for callback, keys in self.subscribers:
+            if keys & changed:
+                callback(self.values)
+        return True
+
+
+class Overlay:
+    """Надпись поверх слоя surface, которая выводится прямо на экран.
+    Перерисовывается, только если изменилась или ее задели
+    обновленные области кадра.
+    """
+
+    def __init__(self, **anchor):
+        """Привязка anchor к экрану, например topleft=(x, y)"""
+        self.anchor = anchor
+        self.image = None
+        self.rect = None
+        self.changed = False
+
+    def set_image(self, image):
+        """Новая картинка надписи (None - скрыть надпись)"""
+        self.image = image
+        self.changed = True
+
+    def draw(self, full, rects):
+        """Вывод надписи на экран.
+        Возвращает области экрана, которые нужно обновить.
+        """
+        rect = None
+        if self.image is not None:
+            rect = self.image.get_rect(**self.anchor)
+        if not (
+            full or self.changed
+            or (rect and rect.collidelist(rects) != -1)
+        ):
+            return []
+        """Под надписью восстанавливаем слой, чтобы сглаженные
+        края букв не накапливались от кадра к кадру
+        """
+        updated = []
+        if self.changed and self.rect:
+            screen.blit(surface, self.rect, self.rect)
+            updated.append(self.rect)
+        if rect:
+            screen.blit(surface, rect, rect)
+            screen.blit(self.image, rect)
+            updated.append(rect)
+        self.rect = rect
+        self.changed = False
+        return updated
+
+
+class Renderer:
+    """Подписчик событий Game, который рисует игру в окне pygame"""
+
+    kinds = (CELLS_ERASED, SCREEN_REFRESH, PROFILER_TOGGLE, QUIT)
+
+    def __init__(self):
+        """Спрайты готовятся заранее, до первого кадра"""
+        self.atlas = get_sprite_atlas()
+        self.hud = HudModel(1 / HUD_MAX_REFRESH_RATE)
+        self.hud.subscribe(
+            self.show_info, ('mode', 'length', 'record', 'speed')
+        )
+        self.hud.subscribe(self.update_banner, ('captures',))
+        self.banner = Overlay(topleft=(GRID_SIZE // 3, GRID_SIZE // 4))
+        self.profile = Overlay(
+            bottomleft=(GRID_SIZE // 3, SCREEN_HEIGHT - GRID_SIZE // 4)
+        )
+        self.profile_text = TextCache(pg.font.Font(None, 22))
+        self.profile_at = 0
+        self.show_profile = False
+
+    @staticmethod
+    def show_info(values):
+        """Вывод информации в шапку окна"""
+        pg.display.set_caption(
+            f'Изгиб питона. Вы на {values["mode"]}. '
+            f'Длина: {values["length"]} '
+            f'(рекорд: {values["record"]}) '
+            f'Скорость: {values["speed"]} |'
+            f' ESC - выход | 1 - изи | 2 - хард | 3 - экстраз | 4 - боты'
+            ' | 5 - замеры'
+        )
+
+    def update_banner(self, values):
+        """Готовит надпись о захваченных ботах"""
+        if values['captures'] > 0:
+            self.banner.set_image(text_cache.render(
+                f'Пошла охота на змееботов! '
+                f'Вы захватили: {values["captures"]} шт.',
+                TEXT_COLOR
+            ))
+
+    def toggle_profile(self):
+        """Показ и скрытие замеров фаз. Пока замеры скрыты,
+        профайлер работает, только если пишется трассировка.
+        """
+        self.show_profile = not self.show_profile
+        profiler.enabled = self.show_profile or bool(profiler.trace_path)
+        self.profile_at = 0
+        if not self.show_profile:
+            self.profile.set_image(None)
+
+    def update_profile(self):
+        """Таблица p50/p99 фаз, не чаще HUD_MAX_REFRESH_RATE раз в секунду"""
+        now = perf_counter()
+        if now - self.profile_at < 1 / HUD_MAX_REFRESH_RATE:
+            return
+        self.profile_at = now
+        rows = [('фаза', 'p50, мс', 'p99, мс')] + [
+            (name, f'{p50:.3f}', f'{p99:.3f}')
+            for name, p50, p99 in profiler.summary()
+        ]
+        line = self.profile_text.font.get_linesize()
+        columns = (4, 4 + GRID_SIZE * 4, 4 + GRID_SIZE * 6)
+        image = pg.Surface((GRID_SIZE * 8, line * len(rows) + 8))
+        image.fill(BOARD_BACKGROUND_COLOR)
+        for row, cells in enumerate(rows):
+            for x, text in zip(columns, cells):
+                image.blit(
+                    self.profile_text.render(text, TEXT_COLOR),
+                    (x, 4 + row * line)
+                )
+        self.profile.set_image(image)
+
+    @staticmethod
+    def report():
+        """Сводка игрового цикла и кэша надписей в консоль
+        и запись трассировки фаз перед выходом
+        """
+        if loop_stats.frames:
+            print(loop_stats.report())
+            print(
+                f'Кэш надписей: попаданий {text_cache.hits}, '
+                f'промахов {text_cache.misses}.'
+            )
+        if profiler.trace_path and profiler.trace:
+            profiler.export_trace()
+            print(f'Трассировка фаз записана в {profiler.trace_path}.')
+
+    def notify(self, game, events):
+        """Стирает ячейки и перезаливает экран по событиям такта"""
+        for kind, data in events:
+            if kind == CELLS_ERASED:
+                owner, positions = data
+                for position in positions:
+                    owner.erase_cell(position)
+            elif kind == SCREEN_REFRESH:
+                self.repaint(game)
+            elif kind == PROFILER_TOGGLE:
+                self.toggle_profile()
+            elif kind == QUIT:
+                self.report()
+                Game.handle_quit()
+
+    def render(self, game, alpha=0):
+        """Отрисовка кадра по текущему состоянию игры.
+        На экран переносятся только измененные области слоя surface.
+        alpha - доля следующего шага, уже прошедшая по часам.
+        """
+        snake = game.snake
+        with profiler.phase('camera'):
+            self.follow_camera(game)
+        with profiler.phase('show_info'):
+            self.hud.update(
+                mode=snake.mode_display,
+                length=snake.length // GRID_SIZE,
+                record=snake.get_best_result(),
+                speed=snake.get_speed_level(),
+                captures=game.bot_capture_amount
+            )
+        with profiler.phase('draw_objects'):
+            for snack in game.snacks:
+                if snack.is_active:
+                    snack.draw()
+            for bot in game.bots:
+                if bot.is_active:
+                    bot.draw(alpha)
+        with profiler.phase('blit'):
+            full, rects = dirty_rects.take()
+            if full:
+                screen.blit(surface, (0, 0))
+            else:
+                for rect in rects:
+                    screen.blit(surface, rect, rect)
+        with profiler.phase('draw_snake'):
+            game.snake.draw(alpha)
+        with profiler.phase('overlays'):
+            if self.show_profile:
+                self.update_profile()
+            overlays = self.banner.draw(full, rects)
+            overlays += self.profile.draw(full, rects)
+            rects.extend(overlays)
+        with profiler.phase('display_update'):
+            if full:
+                pg.display.update()
+            else:
+                pg.display.update(rects)
 
     @staticmethod
     def screen_refresh():
         """Перезаливка экрана на слое surface"""
         surface.fill(BOARD_BACKGROUND_COLOR)
+        dirty_rects.add_full()
 
-    @staticmethod
-    def is_collision(position1, position2, threshold=GRID_SIZE):
-        """Метод проверяет, есть ли столкновение"""
-        x1, y1 = position1
-        x2, y2 = position2
-        distance = (x2 - x1) ** 2 + (y2 - y1) ** 2
-        return distance < threshold ** 2
+    def follow_camera(self, game):
+        """Камера на поле игры и голове змеи. После сдвига
+        окно перерисовывается целиком.
+        """
+        if camera.board is not game.board:
+            camera.set_board(game.board)
+            self.repaint(game)
+        if camera.follow(game.board.unpack(game.snake.get_head_position())):
+            self.repaint(game)
+
+    def repaint(self, game):
+        """Перезаливка экрана и полная перерисовка змей
+        (после смены режима, переключения объектов или сдвига камеры)
+        """
+        self.screen_refresh()
+        for snake in (game.snake, *game.bots):
+            snake.repaint()
+
+
+def handle_keys():
+    """Функция для обработки действий пользователя.
+    Возвращает коды нажатых клавиш для Game.step.
+    """
+    keys = []
+    for event in pg.event.get():
+        if event.type == pg.QUIT:
+            """Закрытие окна - то же, что ESC: выход идет через
+            Game.step, и подписчики успевают все сохранить
+            """
+            keys.append(K_ESCAPE)
+        if event.type == pg.KEYDOWN:
+            keys.append(event.key)
+    return keys
+
+
+class LoopStats:
+    """Статистика игрового цикла: время кадров и тактов логики"""
+
+    def __init__(self, window=RENDER_FPS * 5):
+        """Хранит последние window замеров"""
+        self.frame_times = deque(maxlen=window)
+        self.tick_times = deque(maxlen=window)
+        self.frames = 0
+        self.ticks = 0
+
+    def add_frame(self, seconds):
+        """Время отрисовки одного кадра"""
+        self.frames += 1
+        self.frame_times.append(seconds)
+
+    def add_ticks(self, amount, seconds):
+        """Время amount тактов логики, выполненных за кадр"""
+        if amount:
+            self.ticks += amount
+            self.tick_times.append(seconds / amount)
 
     @staticmethod
-    def handle_quit():
-        """Выход из программы"""
-        pg.quit()
-        exit()
+    def describe(times):
+        """Среднее и максимум в миллисекундах"""
+        if not times:
+            return 'нет данных'
+        return (
+            f'{sum(times) / len(times) * 1000:.3f} мс '
+            f'(макс. {max(times) * 1000:.3f} мс)'
+        )
 
+    def report(self):
+        """Сводка для вывода в консоль"""
+        return (
+            f'Кадров: {self.frames}, тактов: {self.ticks}. '
+            f'Кадр: {self.describe(self.frame_times)}. '
+            f'Такт: {self.describe(self.tick_times)}.'
+        )
 
-def handle_keys(game, snake, snacks, bots):
-    """Функция для запуска обработки действий пользователя"""
-    Game.handle_user_events(game, snake, snacks, bots)
 
+loop_stats = LoopStats()
 
-def main():
-    """Запуск игры"""
-    game = Game()
-    Game.screen_refresh()
-    for bot in game.bots:
-        bot.toggle_object()
-    for snack in game.snacks[1:]:
-        snack.toggle_object()
+
+def main(
+        record=None, trace=None, movement=PIXEL_MOVEMENT, board=None,
+        bots=BOT_COUNT
+):
+    """Запуск игры. Логика идет с фиксированным шагом step_ticks / скорость
+    змеи (несколько тактов за кадр), а кадры рисуются не чаще RENDER_FPS.
+    Клеточная змея рисуется между клетками по остатку времени шага.
+    record - путь к файлу, в который записываются нажатия для повтора.
+    trace - путь к файлу трассировки фаз (Chrome trace-event JSON).
+    movement - модель движения (см. SNAKE_MODELS).
+    board - размеры поля в клетках (ширина, высота), по умолчанию
+    BOARD_WIDTH x BOARD_HEIGHT.
+    bots - количество змееботов.
+    """
+    if trace:
+        profiler.trace_path = trace
+        profiler.enabled = True
+    seed = random.randrange(2 ** 32)
+    board = Board(*board, GRID_SIZE) if board else DEFAULT_BOARD
+    game = Game(
+        seed=seed, results=ResultsStore(), movement=movement, board=board,
+        bot_count=bots
+    )
+    if record:
+        game.bus.subscribe(Recorder(record, seed, movement, board, bots))
+    renderer = Renderer()
+    game.bus.subscribe(renderer)
+    renderer.screen_refresh()
+    game.hide_extras()
+    lag = 0
+    keys = []
     while True:
-        clock.tick(game.snake.speed)
-        game.timer += 1
-        handle_keys(game, game.snake, game.snacks[1:], game.bots)
-        game.snake.show_info()
-        game.snake.handle_speed_mode_change()
-        game.snake.move()
-        game.handle_selfbite()
-        game.handle_objects_activity()
-        for snack in game.snacks:
-            game.handle_eat_snack(snack)
-        for bot in game.bots:
-            game.handle_smash(bot)
-            game.handle_bot_capture(bot)
-            for snack in game.snacks:
-                game.handle_steal_snack(bot, snack)
-        if not game.timer % 2000:
-            Game.handle_captured_bot(game)
-        screen.blit(surface, (0, 0))
-        game.snake.draw()
-        game.display_info()
-        pg.display.update()
+        lag += clock.tick(RENDER_FPS) / 1000
+        with profiler.phase('handle_keys'):
+            keys.extend(handle_keys())
+        steps = 0
+        start = perf_counter()
+        while (
+            lag >= game.step_ticks / game.snake.speed
+            and steps < MAX_STEPS_PER_FRAME
+        ):
+            lag -= game.step_ticks / game.snake.speed
+            game.step(keys)
+            keys = []
+            steps += 1
+        if steps == MAX_STEPS_PER_FRAME:
+            """Не догоняем отставание бесконечно, если кадр затянулся"""
+            lag = 0
+        loop_stats.add_ticks(steps, perf_counter() - start)
+        start = perf_counter()
+        with profiler.phase('render'):
+            renderer.render(
+                game, lag * game.snake.speed / game.step_ticks
+            )
+        loop_stats.add_frame(perf_counter() - start)
+
+
+def board_size(text):
+    """Размеры поля из строки вида 500x500"""
+    try:
+        width, height = map(int, text.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'ожидается ШИРИНАxВЫСОТА: {text}')
+    if width < GRID_WIDTH or height < GRID_HEIGHT:
+        raise argparse.ArgumentTypeError(
+            f'поле не меньше окна: {GRID_WIDTH}x{GRID_HEIGHT}'
+        )
+    return width, height
 
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description='Изгиб питона')
+    parser.add_argument(
+        '--record', metavar='PATH',
+        help='записать нажатия в файл для python replay.py PATH'
+    )
+    parser.add_argument(
+        '--trace', metavar='PATH',
+        help='записать трассировку фаз для chrome://tracing'
+    )
+    parser.add_argument(
+        '--movement', choices=MOVEMENTS, default=PIXEL_MOVEMENT,
+        help='модель движения: по пикселю или по клетке за такт'
+    )
+    parser.add_argument(
+        '--board', metavar='WxH', type=board_size, default=None,
+        help='размеры поля в клетках, например 500x500'
+    )
+    parser.add_argument(
+        '--bots', metavar='N', type=int, default=BOT_COUNT,
+        help='количество змееботов (для сотен ботов нужно поле побольше)'
+    )
+    args = parser.parse_args()
+    main(args.record, args.trace, args.movement, args.board, args.bots)
@@ -0,0 +1,140 @@
+"""Турнир стратегий змееботов.
+
+Безголовые игры с заданными зернами распределяются пачками
+по процессам ProcessPoolExecutor. Для каждой стратегии считаются
+захваты ботов, украденные яблоки и такты, прожитые ботом активным.
+Итог пишется в CSV: одна строка на стратегию.
+
+Пример запуска:
+    python tournament.py --games 1000 --ticks 5000 --output results.csv
+"""
+
+import argparse
+import csv
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from bot_policies import POLICIES
+from settings import BOT_CAPTURED, BOT_COUNT, SNACK_STOLEN, TURNS
+from the_snake import Game
+
+
+STAT_FIELDS = ('bots', 'captures', 'stolen', 'survival_ticks')
+PLAYER_KEYS = sorted({key for _, key in TURNS})
+PLAYER_TURN_PERIOD = 100
+
+
+class TournamentStats:
+    """Подписчик событий Game, который копит статистику по стратегиям
+    ботов. Без атрибута kinds: активных ботов он считает каждый такт.
+    """
+
+    def __init__(self, game, names):
+        """names[i] - имя стратегии бота game.bots[i]"""
+        self.owners = dict(zip(game.bots, names))
+        self.stats = {name: Counter() for name in names}
+        for name in names:
+            self.stats[name]['bots'] += 1
+
+    def notify(self, game, events):
+        """Учет событий и активных ботов за такт"""
+        for bot, name in self.owners.items():
+            if bot.is_active:
+                self.stats[name]['survival_ticks'] += 1
+        for kind, data in events:
+            if kind == BOT_CAPTURED:
+                self.stats[self.owners[data]]['captures'] += 1
+            elif kind == SNACK_STOLEN:
+                self.stats[self.owners[data[0]]]['stolen'] += 1
+
+
+def assign_policies(seed, policy_names, bots_amount):
+    """Стратегии ботов в игре с зерном seed (по кругу от seed)"""
+    return [
+        policy_names[(seed + index) % len(policy_names)]
+        for index in range(bots_amount)
+    ]
+
+
+def play_game(seed, policy_names, ticks):
+    """Одна безголовая игра: все объекты активны, игрок
+    поворачивает случайно раз в PLAYER_TURN_PERIOD тактов
+    """
+    names = assign_policies(seed, policy_names, BOT_COUNT)
+    game = Game(
+        seed=seed, bot_policies=[POLICIES[name] for name in names]
+    )
+    stats = TournamentStats(game, names)
+    game.bus.subscribe(stats)
+    for _ in range(ticks):
+        keys = []
+        if not game.timer % PLAYER_TURN_PERIOD:
+            keys.append(game.rng.choice(PLAYER_KEYS))
+        game.step(keys)
+    return stats.stats
+
+
+def play_shard(seeds, policy_names, ticks):
+    """Пачка игр для одного процесса, статистика уже сложена"""
+    total = {name: Counter() for name in policy_names}
+    for seed in seeds:
+        for name, stats in play_game(seed, policy_names, ticks).items():
+            total[name].update(stats)
+    return total
+
+
+def run_tournament(
+        policy_names, games, ticks, workers=None, first_seed=0
+):
+    """Турнир на games играх по ticks тактов на всех ядрах"""
+    workers = workers or os.cpu_count() or 1
+    seeds = range(first_seed, first_seed + games)
+    shards_amount = min(games, workers * 4) or 1
+    shards = [seeds[index::shards_amount] for index in range(shards_amount)]
+    total = {name: Counter() for name in policy_names}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(
+            play_shard, shards,
+            [policy_names] * shards_amount, [ticks] * shards_amount
+        )
+        for shard_stats in results:
+            for name, stats in shard_stats.items():
+                total[name].update(stats)
+    return total
+
+
+def write_results(total, output):
+    """Запись итогов в CSV: стратегия и поля STAT_FIELDS"""
+    writer = csv.writer(output)
+    writer.writerow(('policy', *STAT_FIELDS))
+    for name, stats in total.items():
+        writer.writerow((name, *(stats[field] for field in STAT_FIELDS)))
+
+
+def main(argv=None):
+    """Запуск турнира из командной строки"""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument(
+        '--policies', nargs='+', default=list(POLICIES),
+        choices=list(POLICIES)
+    )
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--ticks', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None)
+    args = parser.parse_args(argv)
+    total = run_tournament(
+        args.policies, args.games, args.ticks, args.workers, args.seed
+    )
+    if args.output:
+        with open(args.output, 'w', newline='', encoding='utf-8') as f:
+            write_results(total, f)
+    else:
+        write_results(total, sys.stdout)
+
+
+if __name__ == '__main__':
+    main()